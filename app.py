@@ -13,20 +13,37 @@ import os
 import json
 import re
 import glob
+import hashlib
 from datetime import datetime
 import streamlit.components.v1 as components
 
 st.set_page_config(page_title="메리츠화재 시상 현황", layout="wide")
 
 DATA_DIR = "data"
+SNAPSHOT_DIR = os.path.join(DATA_DIR, ".snapshots")
 SETTINGS_FILE = "settings.json"
 
 # ═══════════════════════════════════════════════════════
 # 0. 유틸리티
 # ═══════════════════════════════════════════════════════
+_EXCEL_ESC = re.compile(r'_x([0-9A-Fa-f]{4})_')
+
 def _clean_excel_text(s):
     if not s or not isinstance(s, str): return s
-    return re.sub(r'_x([0-9A-Fa-f]{4})_', lambda m: chr(int(m.group(1), 16)), s)
+    return _EXCEL_ESC.sub(lambda m: chr(int(m.group(1), 16)), s)
+
+def _clean_excel_frame(df):
+    """문자열 컬럼의 _xHHHH_ 이스케이프 일괄 복원.
+    _x가 하나라도 있는 컬럼만 str.replace로 디코딩 (값은 셀 단위 _clean_excel_text(str(v))와 동일)"""
+    for col in df.columns:
+        s = df[col]
+        if not (s.dtype == 'object' or pd.api.types.is_string_dtype(s)): continue
+        na = s.isna()
+        txt = s.astype(str)
+        if txt.str.contains('_x', regex=False, na=False).any():
+            txt = txt.str.replace(_EXCEL_ESC, lambda m: chr(int(m.group(1), 16)), regex=True)
+        df[col] = txt.where(~na, s)
+    return df
 
 def safe_str(val):
     if pd.isna(val) or val is None: return ""
@@ -45,11 +62,17 @@ def safe_float(val):
     try: return float(s)
     except: return 0.0
 
-def get_clean_series(df, col_name):
-    ck = f"_ck_{col_name}"
-    if ck not in df.columns:
-        df[ck] = df[col_name].apply(safe_str)
-    return df[ck]
+def safe_float_array(series):
+    """safe_float의 벡터 버전 — Series → float64 ndarray (결측·변환 불가는 0)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype('float64').fillna(0.0).to_numpy()
+    s = series.astype(str).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(s, errors='coerce').astype('float64').fillna(0.0).to_numpy()
+
+def _frozen(arr):
+    """세션 간 공유되는 배열 — 쓰기 금지"""
+    arr.setflags(write=False)
+    return arr
 
 
 # ═══════════════════════════════════════════════════════
@@ -61,7 +84,9 @@ DEFAULT_SETTINGS = {
     "prize_labels": {
         "base": "인보험 기본", "상품": "상품 추가",
         "상품추가": "상품 추가2", "유퍼간편": "유퍼스트"
-    }
+    },
+    # 매니저 폴더 구간: [목표 금액, 하한] — 상한은 바로 위 구간의 하한
+    "mgr_tiers": [[500000, 300000], [300000, 200000], [200000, 100000], [100000, 0]]
 }
 
 @st.cache_data(show_spinner=False)
@@ -83,18 +108,28 @@ def load_settings():
 # ═══════════════════════════════════════════════════════
 # 2. 데이터 로딩
 # ═══════════════════════════════════════════════════════
-def find_latest_files():
-    if not os.path.exists(DATA_DIR):
-        return None, None, None
-    def _latest(pattern):
-        files = glob.glob(os.path.join(DATA_DIR, pattern))
-        if not files: return None
-        def _d(f):
+@st.cache_resource(show_spinner=False)
+def data_catalog():
+    """data/ 폴더 카탈로그 (프로세스 공용)
+    • dir_mtime: 마지막 스캔 시점의 폴더 mtime — 바뀔 때만 다시 스캔
+    • versions: {'sum'|'bridge': [(파일일자, mtime, 경로), ...]} (일자 오름차순)
+    • current: (sum_path, bridge_path, data_date, data_ver)"""
+    return {'dir_mtime': None, 'versions': {}, 'current': (None, None, None, None)}
+
+def _scan_data_dir():
+    def _versions(pattern):
+        out = []
+        for f in glob.glob(os.path.join(DATA_DIR, pattern)):
             m = re.search(r'(\d{8})', os.path.basename(f))
-            return m.group(1) if m else '00000000'
-        return max(files, key=_d)
-    sp = _latest("PRIZE_SUM_OUT_*.xlsx")
-    bp = _latest("PRIZE_6_BRIDGE_OUT_*.xlsx")
+            try: mt = os.path.getmtime(f)
+            except OSError: continue
+            out.append((m.group(1) if m else '00000000', mt, f))
+        return out
+    versions = {'sum': _versions("PRIZE_SUM_OUT_*.xlsx"), 'bridge': _versions("PRIZE_6_BRIDGE_OUT_*.xlsx")}
+    # 같은 일자가 여러 개면 glob 순서상 첫 파일 (기존 max(files, key=일자)와 동일)
+    sv = max(versions['sum'], key=lambda v: v[0]) if versions['sum'] else None
+    bv = max(versions['bridge'], key=lambda v: v[0]) if versions['bridge'] else None
+    sp, bp = (sv[2] if sv else None), (bv[2] if bv else None)
     dd = None
     if sp:
         m = re.search(r'(\d{8})', os.path.basename(sp))
@@ -103,22 +138,65 @@ def find_latest_files():
             file_date = datetime.strptime(m.group(1), '%Y%m%d')
             base_date = file_date - timedelta(days=1)
             dd = base_date.strftime('%Y.%m.%d')
-    return sp, bp, dd
+    data_ver = f"{sv[1] if sv else 0}_{bv[1] if bv else 0}"
+    for v in versions.values(): v.sort()
+    return versions, (sp, bp, dd, data_ver)
+
+def find_latest_files():
+    """현재 데이터 버전 — Returns (sum_path, bridge_path, data_date, data_ver)
+    평소에는 폴더 stat 한 번, 파일이 추가·삭제·교체(rename)된 경우에만 다시 스캔한다.
+    같은 이름으로 덮어쓴 경우는 관리자 캐시 초기화로 다시 스캔."""
+    cat = data_catalog()
+    try: dm = os.stat(DATA_DIR).st_mtime_ns
+    except OSError: return None, None, None, None
+    if cat['dir_mtime'] != dm:
+        versions, current = _scan_data_dir()
+        cat.update(versions=versions, current=current, dir_mtime=dm)
+    return cat['current']
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def read_snapshot(path, reader):
+    """Excel 파일을 Parquet 스냅샷으로 변환해 두고, 같은 파일이면 스냅샷만 읽는다.
+    스냅샷 키: 파일명 + mtime + 내용 해시 (하나라도 바뀌면 다시 파싱)"""
+    base = os.path.splitext(os.path.basename(path))[0]
+    snap = os.path.join(SNAPSHOT_DIR, f"{base}_{int(os.path.getmtime(path))}_{_file_digest(path)[:16]}.parquet")
+    if os.path.exists(snap):
+        try:
+            df = pd.read_parquet(snap)
+            # pandas 2.x는 문자열 결측을 None으로 돌려주므로 NaN으로 통일
+            for col in df.columns:
+                if df[col].dtype == 'object':
+                    df[col] = df[col].where(df[col].notna(), np.nan)
+            return df
+        except Exception: pass
+    df = reader(path)
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp = snap + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, snap)
+        for old in glob.glob(os.path.join(SNAPSHOT_DIR, f"{glob.escape(base)}_*.parquet")):
+            if old != snap: os.remove(old)
+    except Exception: pass
+    return df
 
 @st.cache_data(show_spinner="데이터를 로딩하고 있습니다...")
 def load_and_merge(sum_path, bridge_path, cache_ver=None):
     def _read(path):
         df = pd.read_excel(path)
         df.columns = [_clean_excel_text(str(c)) if isinstance(c, str) else c for c in df.columns]
-        for col in df.columns:
-            if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
-                df[col] = df[col].apply(lambda v: _clean_excel_text(str(v)) if pd.notna(v) else v)
-        return df
-    df_sum = _read(sum_path)
+        return _clean_excel_frame(df)
+    df_sum = read_snapshot(sum_path, _read)
     mc = '대리점설계사조직코드'
     df_sum['_key'] = df_sum[mc].apply(safe_str)
     if bridge_path and os.path.exists(bridge_path):
-        df_br = _read(bridge_path)
+        df_br = read_snapshot(bridge_path, _read)
         df_br['_key'] = df_br[mc].apply(safe_str)
         br_only = [c for c in df_br.columns if c not in df_sum.columns or c == '_key']
         df = pd.merge(df_sum, df_br[br_only], on='_key', how='left')
@@ -126,6 +204,50 @@ def load_and_merge(sum_path, bridge_path, cache_ver=None):
         df = df_sum.copy()
     return df
 
+_BRANCH_NO = re.compile(r'(?<!\d)(\d+)\s*지점')
+
+@st.cache_resource(show_spinner=False)
+def build_data_index(_df, cache_ver=None):
+    """데이터 버전별 조회 인덱스 (세션 공용, 읽기 전용)
+    • agents: 정규화 대리점설계사조직코드 → 첫 번째 행 위치
+    • managers: 정규화 지원매니저코드 → {'pos': 행 위치, 'agents': 소속 설계사 코드, 'name': 매니저명}
+    • keys: 정규화 코드 배열 (행 순서, 읽기 전용) — 캐시된 DataFrame은 건드리지 않는다
+    • names: 대리점설계사명(공백 제거) → 행 위치, branch_no: 지점조직명의 'N지점' 번호 (없으면 -1)"""
+    keys = _frozen(_df['_key'].to_numpy(dtype=object, copy=True))
+    agents = {}
+    for pos, k in enumerate(keys.tolist()):
+        agents.setdefault(k, pos)
+
+    managers = {}
+    mgr_keys = None
+    mc_col, mn_col = '지원매니저코드', '지원매니저명'
+    if mc_col in _df.columns:
+        mgr_keys = _frozen(_df[mc_col].apply(safe_str).to_numpy(dtype=object))
+        mkeys = pd.Series(mgr_keys)
+        for mk, rows in mkeys.groupby(mkeys, sort=False).indices.items():
+            name = ""
+            if mn_col in _df.columns:
+                name = _clean_excel_text(safe_str(_df[mn_col].iat[rows[0]]))
+            managers[mk] = {
+                'pos': _frozen(rows),
+                'agents': [k for k in dict.fromkeys(keys[rows].tolist()) if k],
+                'name': name,
+            }
+
+    names, branch_no = {}, None
+    nc, bc = '대리점설계사명', '지점조직명'
+    if nc in _df.columns:
+        sn = _df[nc].fillna('').astype(str).str.strip()
+        names = {k: _frozen(v) for k, v in sn.groupby(sn, sort=False).indices.items()}
+    if bc in _df.columns:
+        # '01지점'처럼 0으로 시작하는 번호는 정수 비교와 문자열 매칭이 달라 -1로 두고 정규식에 맡긴다
+        bn = _df[bc].fillna('').astype(str).str.extract(_BRANCH_NO, expand=False).fillna('')
+        ok = bn.str.fullmatch(r'0|[1-9]\d*')
+        branch_no = _frozen(bn.where(ok, '-1').astype('int64').to_numpy())
+    return {'agents': agents, 'managers': managers,
+            'keys': {'agent': keys, 'manager': mgr_keys},
+            'names': names, 'branch_no': branch_no}
+
 
 # ═══════════════════════════════════════════════════════
 # 3. 시상 구조 자동 감지
@@ -212,27 +334,54 @@ def detect_prize_structure(cols_tuple, labels_json):
 # ═══════════════════════════════════════════════════════
 # 4. 에이전트 시상 계산
 # ═══════════════════════════════════════════════════════
-def calculate_agent_performance(target_code, df, ps):
-    """설계사 코드로 시상 결과 리스트 반환. Returns (results, total)"""
+@st.cache_resource(show_spinner=False)
+def build_numeric_view(_df, ps, cache_ver=None):
+    """시상 구조에 쓰이는 실적/대상/예정금/시상금/부족금액/목표 컬럼을 float64로 한 번만 변환.
+    Returns {컬럼명: 읽기 전용 ndarray (전체 행)} — 값은 safe_float와 동일"""
+    cols = []
+    for info in ps['weeks'].values():
+        cols.append(info['perf'])
+        for it in info['items']:
+            cols += [it['elig'], it['prize']]
+    for key in ('consec', 'bridge'):
+        c = ps.get(key)
+        if c: cols += [c['prize'], c['prev'], c['curr'], c.get('shortfall'), c.get('target')]
+    return {c: _frozen(safe_float_array(_df[c])) for c in dict.fromkeys(cols) if c and c in _df.columns}
+
+def calculate_agent_performance(target_code, df, ps, agent_index=None, num_view=None):
+    """설계사 코드로 시상 결과 리스트 반환. Returns (results, total)
+    agent_index(build_data_index의 'agents')가 있으면 전체 스캔 없이 행을 바로 찾고,
+    num_view(build_numeric_view)가 있으면 문자열 재파싱 없이 숫자를 읽는다."""
     code_col = '대리점설계사조직코드'
     if code_col not in df.columns:
         return [], 0
-    match = df[get_clean_series(df, code_col) == safe_str(target_code)]
-    if match.empty:
-        return [], 0
-    row = match.iloc[0]
+    if agent_index is not None:
+        pos = agent_index.get(safe_str(target_code))
+        if pos is None:
+            return [], 0
+    else:
+        hits = np.flatnonzero(df['_key'].to_numpy() == safe_str(target_code))
+        if not len(hits):
+            return [], 0
+        pos = hits[0]
+    row = df.iloc[pos]
+    nums = num_view or {}
+
+    def num(col):
+        if col in nums: return float(nums[col][pos])
+        return safe_float(row.get(col, 0))
     results = []
 
     # ── 주차별 시상 ──
     for w, info in ps['weeks'].items():
-        perf = safe_float(row.get(info['perf'], 0)) if info['perf'] else 0
+        perf = num(info['perf']) if info['perf'] else 0
         details = []
         has_eligible = False
         for it in info['items']:
-            elig = safe_float(row.get(it['elig'], 0))
+            elig = num(it['elig'])
             if elig == 0: continue
             has_eligible = True
-            amt = safe_float(row.get(it['prize'], 0))
+            amt = num(it['prize'])
             if amt > 0:
                 details.append({'label': it['label'], 'amount': amt})
         prize = sum(d['amount'] for d in details)
@@ -246,11 +395,11 @@ def calculate_agent_performance(target_code, df, ps):
     # ── 연속가동 (브릿지보다 먼저 표시) ──
     if ps.get('consec'):
         c = ps['consec']
-        cp = safe_float(row.get(c['prize'], 0))
-        vp = safe_float(row.get(c['prev'], 0)) if c['prev'] else 0
-        vc = safe_float(row.get(c['curr'], 0)) if c['curr'] else 0
-        sf = safe_float(row.get(c.get('shortfall', ''), 0)) if c.get('shortfall') else 0
-        tgt = safe_float(row.get(c.get('target', ''), 0)) if c.get('target') else 0
+        cp = num(c['prize'])
+        vp = num(c['prev']) if c['prev'] else 0
+        vc = num(c['curr']) if c['curr'] else 0
+        sf = num(c['shortfall']) if c.get('shortfall') else 0
+        tgt = num(c['target']) if c.get('target') else 0
         if vp > 0 or vc > 0 or cp > 0:
             results.append({
                 'name': f"연속가동 시상 ({c['lp']}~{c['lc']})",
@@ -263,11 +412,11 @@ def calculate_agent_performance(target_code, df, ps):
     # ── 브릿지 ──
     if ps.get('bridge'):
         b = ps['bridge']
-        bp = safe_float(row.get(b['prize'], 0))
-        vp = safe_float(row.get(b['prev'], 0)) if b['prev'] else 0
-        vc = safe_float(row.get(b['curr'], 0)) if b['curr'] else 0
-        sf = safe_float(row.get(b.get('shortfall', ''), 0)) if b.get('shortfall') else 0
-        tgt = safe_float(row.get(b.get('target', ''), 0)) if b.get('target') else 0
+        bp = num(b['prize'])
+        vp = num(b['prev']) if b['prev'] else 0
+        vc = num(b['curr']) if b['curr'] else 0
+        sf = num(b['shortfall']) if b.get('shortfall') else 0
+        tgt = num(b['target']) if b.get('target') else 0
         if vp > 0 or vc > 0 or bp > 0:
             results.append({
                 'name': f"브릿지 시상 ({b['lp']}~{b['lc']})",
@@ -281,6 +430,117 @@ def calculate_agent_performance(target_code, df, ps):
     return results, total
 
 
+PRIZE_TABLE_COLS = ['code', 'pos', 'seq', 'name', 'type', 'val', 'val_prev', 'val_curr',
+                    'prize', 'shortfall', 'target', 'total']
+
+@st.cache_resource(show_spinner=False)
+def compute_prize_table(_df, ps, cache_ver=None, _num_view=None):
+    """calculate_agent_performance의 일괄 버전 — 전 설계사 시상 결과를 한 번에 계산.
+    결과 1건 = 1행 (code, pos, seq 순서, 'total'은 설계사별 합계).
+    설계사 코드가 중복되면 첫 행 기준 (단건 계산과 동일)."""
+    code_col = '대리점설계사조직코드'
+    if code_col not in _df.columns:
+        return pd.DataFrame(columns=PRIZE_TABLE_COLS)
+    keys = _df['_key'].to_numpy()
+    pos = np.flatnonzero(~_df['_key'].duplicated().to_numpy())
+    n = len(pos)
+    zeros = np.zeros(n)
+
+    nums = _num_view or {}
+
+    def col(c):
+        if c in nums: return nums[c][pos]
+        return safe_float_array(_df[c])[pos] if c and c in _df.columns else zeros
+
+    parts = []
+    total = np.zeros(n)
+
+    def add(inc, **cols):
+        seq = len(parts)
+        part = {'code': keys[pos[inc]], 'pos': pos[inc], 'seq': seq}
+        for k, v in cols.items():
+            part[k] = v[inc] if isinstance(v, np.ndarray) else v
+        parts.append(pd.DataFrame(part))
+        total[inc] += cols['prize'][inc]
+
+    # ── 주차별 시상 ──
+    for w, info in ps['weeks'].items():
+        perf = col(info['perf'])
+        prize = np.zeros(n)
+        has_eligible = np.zeros(n, dtype=bool)
+        for it in info['items']:
+            elig = col(it['elig']) != 0
+            amt = col(it['prize'])
+            has_eligible |= elig
+            prize += np.where(elig & (amt > 0), amt, 0.0)
+        add(has_eligible | (perf > 0), name=f'{w}주차 시상', type='구간', val=perf, prize=prize)
+
+    # ── 연속가동 → 브릿지 ──
+    for key, name, typ in (('consec', '연속가동 시상', '연속가동 브릿지'), ('bridge', '브릿지 시상', '브릿지_확정')):
+        c = ps.get(key)
+        if not c: continue
+        cp, vp, vc = col(c['prize']), col(c['prev']), col(c['curr'])
+        add((vp > 0) | (vc > 0) | (cp > 0), name=f"{name} ({c['lp']}~{c['lc']})", type=typ,
+            val_prev=vp, val_curr=vc, prize=cp,
+            shortfall=col(c.get('shortfall')), target=col(c.get('target')))
+
+    if not parts:
+        return pd.DataFrame(columns=PRIZE_TABLE_COLS)
+    tbl = pd.concat(parts, ignore_index=True).reindex(columns=PRIZE_TABLE_COLS)
+    tbl['total'] = pd.Series(total, index=pos).reindex(tbl['pos']).to_numpy()
+    return tbl.sort_values(['pos', 'seq'], kind='stable', ignore_index=True)
+
+
+def tier_ranges(tiers):
+    """[[목표, 하한], ...] → [(목표, 하한, 상한), ...] (하한 내림차순, 최상위 상한은 inf)
+    숫자 쌍이 아닌 항목은 건너뛰고, 목표가 겹치면 먼저 나온 구간만 사용 (유효 구간이 없으면 기본값)"""
+    valid, seen = [], set()
+    for x in tiers if isinstance(tiers, list) else []:
+        if not (isinstance(x, (list, tuple)) and len(x) == 2 and
+                all(isinstance(v, (int, float)) and not isinstance(v, bool) and np.isfinite(v) for v in x)):
+            continue
+        if x[0] in seen: continue
+        seen.add(x[0])
+        valid.append(x)
+    out, upper = [], float('inf')
+    for t, mn in sorted(valid or DEFAULT_SETTINGS['mgr_tiers'], key=lambda x: -x[1]):
+        out.append((t, mn, upper))
+        upper = mn
+    return out
+
+@st.cache_resource(show_spinner=False)
+def build_tier_index(_df, _tbl, _managers, tiers_json, cache_ver=None):
+    """매니저 × 카테고리(구간/브릿지) × 구간별 인원수·명단을 한 번에 계산.
+    Returns {(매니저코드, 카테고리): {목표: [(code, 이름, 소속, 실적), ...]}} — 명단은 (소속, 이름) 순"""
+    ranges = tier_ranges(json.loads(tiers_json))[::-1]
+    lows = np.array([mn for _, mn, _ in ranges], dtype=float)
+    targets = np.array([t for t, _, _ in ranges], dtype=object)
+    index = {}
+    if _tbl.empty or not _managers or not len(lows):
+        return index
+
+    v = _tbl['val'].fillna(_tbl['val_prev']).fillna(0).to_numpy(dtype=float)
+    b = np.searchsorted(lows, v, side='right') - 1
+    tbl = _tbl.assign(v=v, tier=targets[np.maximum(b, 0)])[b >= 0]
+    tbl = pd.concat([tbl[tbl['type'].str.contains(cat, regex=False)].assign(cat=cat) for cat in ('구간', '브릿지')])
+    # 설계사별로 구간마다 첫 번째 결과만 (결과 순서 = seq)
+    tbl = tbl.sort_values(['pos', 'seq'], kind='stable').drop_duplicates(['cat', 'tier', 'code'])
+
+    an_col, ag_col = '대리점설계사명', '대리점지사명'
+    tbl['aname'] = "이름없음"
+    tbl['agency'] = ""
+    if an_col in _df.columns:
+        tbl['aname'] = [_clean_excel_text(safe_str(x)) for x in _df[an_col].to_numpy()[tbl['pos'].to_numpy()]]
+        if ag_col in _df.columns:
+            tbl['agency'] = [_clean_excel_text(safe_str(x)) for x in _df[ag_col].to_numpy()[tbl['pos'].to_numpy()]]
+
+    pairs = pd.DataFrame([(mk, code) for mk, m in _managers.items() for code in m['agents']], columns=['mgr', 'code'])
+    tbl = pairs.merge(tbl, on='code').sort_values(['agency', 'aname', 'pos'], kind='stable')
+    for (mk, cat, t), g in tbl.groupby(['mgr', 'cat', 'tier'], sort=False):
+        index.setdefault((mk, cat), {})[t] = list(zip(g['code'], g['aname'], g['agency'], g['v']))
+    return index
+
+
 # ═══════════════════════════════════════════════════════
 # 5. 카카오톡 복사 컴포넌트
 # ═══════════════════════════════════════════════════════
@@ -328,9 +588,9 @@ def copy_btn_component(text):
 # ═══════════════════════════════════════════════════════
 # 6. UI 카드 렌더링
 # ═══════════════════════════════════════════════════════
-def render_ui_cards(user_name, results, total_prize, data_date, show_share=False):
-    if not results: return
-
+def _build_ui_cards(user_name, results, total_prize, data_date):
+    """요약 카드 HTML, 상세 카드 HTML 목록, 카톡 공유 문구 생성"""
+    cards = []
     date_html = f"<div class='date-badge'>📅 기준일: {data_date}</div>" if data_date else ""
 
     share = f"🎯 [{user_name} 팀장님 실적 현황]\n"
@@ -350,7 +610,6 @@ def render_ui_cards(user_name, results, total_prize, data_date, show_share=False
                 sh += f"<div class='data-row' style='padding:6px 0;align-items:flex-start;'><span class='summary-item-name'>{r['name']}<br><span style='font-size:0.95rem;color:rgba(255,255,255,0.7);'>{cond}</span></span><span class='summary-item-val'>{r['prize']:,.0f}원</span></div>"
                 share += f"🔹 {r['name']}: {r['prize']:,.0f}원 {cond}\n"
         sh += "</div>"
-        st.markdown(sh, unsafe_allow_html=True)
 
         # ── 상세 카드 ──
         for r in results:
@@ -391,7 +650,25 @@ def render_ui_cards(user_name, results, total_prize, data_date, show_share=False
             else:
                 continue
 
-            st.markdown(ch, unsafe_allow_html=True)
+            cards.append(ch)
+
+    return sh, cards, share
+
+@st.cache_data(show_spinner=False, max_entries=500)
+def build_ui_cards(user_name, agent_code, data_ver, data_date, _results, _total_prize):
+    """설계사·데이터 버전별 카드 렌더 캐시 (오래된 항목부터 제거)"""
+    return _build_ui_cards(user_name, _results, _total_prize, data_date)
+
+def render_ui_cards(user_name, results, total_prize, data_date, show_share=False, agent_code=None, data_ver=None):
+    if not results: return
+
+    if agent_code is not None and data_ver is not None:
+        sh, cards, share = build_ui_cards(user_name, safe_str(agent_code), data_ver, data_date, results, total_prize)
+    else:
+        sh, cards, share = _build_ui_cards(user_name, results, total_prize, data_date)
+    st.markdown(sh, unsafe_allow_html=True)
+    for ch in cards:
+        st.markdown(ch, unsafe_allow_html=True)
 
     if show_share:
         st.markdown("<h4 class='main-title' style='margin-top:10px;'>💬 카카오톡 바로 공유하기</h4>", unsafe_allow_html=True)
@@ -475,7 +752,7 @@ st.markdown("""
 # 8. 메인 앱
 # ═══════════════════════════════════════════════════════
 settings = load_settings()
-sp, bp, data_date = find_latest_files()
+sp, bp, data_date, data_ver = find_latest_files()
 
 if not sp:
     st.markdown('<div class="title-band">메리츠화재 시상 현황</div>', unsafe_allow_html=True)
@@ -488,13 +765,18 @@ if not sp:
     """)
     st.stop()
 
-sp_mtime = os.path.getmtime(sp) if sp else 0
-bp_mtime = os.path.getmtime(bp) if bp and os.path.exists(bp) else 0
-df_merged = load_and_merge(sp, bp, cache_ver=f"{sp_mtime}_{bp_mtime}")
+df_merged = load_and_merge(sp, bp, cache_ver=data_ver)
+data_idx = build_data_index(df_merged, cache_ver=data_ver)
+agent_idx = data_idx['agents']
+mgr_idx = data_idx['managers']
 ps = detect_prize_structure(
     tuple(df_merged.columns.tolist()),
     json.dumps(settings.get('prize_labels', DEFAULT_SETTINGS['prize_labels']), ensure_ascii=False)
 )
+num_view = build_numeric_view(df_merged, ps, cache_ver=data_ver)
+prize_tbl = compute_prize_table(df_merged, ps, cache_ver=data_ver, _num_view=num_view)
+mgr_tiers = settings.get('mgr_tiers', DEFAULT_SETTINGS['mgr_tiers'])
+tier_idx = build_tier_index(df_merged, prize_tbl, mgr_idx, json.dumps(mgr_tiers), cache_ver=data_ver)
 
 mode = st.radio(
     "화면 선택",
@@ -519,19 +801,21 @@ if mode == "📊 내 실적 조회":
     cc = '대리점설계사조직코드'
 
     if user_name and branch_code and nc in df_merged.columns and cc in df_merged.columns:
-        sn = df_merged[nc].fillna('').astype(str).str.strip()
-        nm = (sn == user_name.strip())
+        rows = data_idx['names'].get(user_name.strip(), np.empty(0, dtype=np.intp))
         if branch_code.strip() == "0000":
-            match = df_merged[nm]
+            match = rows
         else:
             code_num = branch_code.replace("지점", "").strip()
             if code_num and bc in df_merged.columns:
-                sb = df_merged[bc].fillna('').astype(str)
-                match = df_merged[nm & sb.str.contains(rf"(?<!\d){code_num}\s*지점", regex=True)]
+                if re.fullmatch(r'0|[1-9][0-9]*', code_num):
+                    match = rows[data_idx['branch_no'][rows] == int(code_num)]
+                else:
+                    sb = df_merged[bc].iloc[rows].fillna('').astype(str)
+                    match = rows[sb.str.contains(rf"(?<!\d){code_num}\s*지점", regex=True).to_numpy(dtype=bool)]
             else:
-                match = pd.DataFrame()
-        if not match.empty and cc in df_merged.columns:
-            for ac in get_clean_series(df_merged, cc)[match.index]:
+                match = None
+        if match is not None:
+            for ac in data_idx['keys']['agent'][match]:
                 if ac: codes_found.add(ac)
 
     sel_code = None
@@ -546,16 +830,15 @@ if mode == "📊 내 실적 조회":
             st.error("일치하는 정보가 없습니다.")
         else:
             fc = sel_code if sel_code else list(codes_found)[0]
-            cr, tp = calculate_agent_performance(fc, df_merged, ps)
+            cr, tp = calculate_agent_performance(fc, df_merged, ps, agent_idx, num_view)
             if cr:
                 dn = user_name
                 ac_col = '대리점지사명'
-                if ac_col in df_merged.columns:
-                    m = df_merged[get_clean_series(df_merged, cc) == safe_str(fc)]
-                    if not m.empty:
-                        av = _clean_excel_text(str(m[ac_col].values[0]).strip())
-                        if av and av != 'nan': dn = f"{av} {user_name}"
-                render_ui_cards(dn, cr, tp, data_date, show_share=False)
+                pos = agent_idx.get(safe_str(fc))
+                if ac_col in df_merged.columns and pos is not None:
+                    av = _clean_excel_text(str(df_merged[ac_col].iat[pos]).strip())
+                    if av and av != 'nan': dn = f"{av} {user_name}"
+                render_ui_cards(dn, cr, tp, data_date, show_share=False, agent_code=fc, data_ver=data_ver)
             else:
                 st.error("해당 조건의 실적 데이터가 없습니다.")
 
@@ -565,12 +848,6 @@ if mode == "📊 내 실적 조회":
 elif mode == "👥 매니저 관리":
     st.markdown('<div class="title-band">매니저 소속 실적 관리</div>', unsafe_allow_html=True)
 
-    mc_col = '지원매니저코드'
-    mn_col = '지원매니저명'
-    ac_col = '대리점설계사조직코드'
-    an_col = '대리점설계사명'
-    ag_col = '대리점지사명'
-
     if 'mgr_logged_in' not in st.session_state:
         st.session_state.mgr_logged_in = False
 
@@ -581,7 +858,7 @@ elif mode == "👥 매니저 관리":
                 st.warning("코드를 입력해주세요.")
             else:
                 sic = safe_str(mgr_input)
-                if mc_col in df_merged.columns and sic in get_clean_series(df_merged, mc_col).unique():
+                if sic in mgr_idx:
                     st.session_state.mgr_logged_in = True
                     st.session_state.mgr_code = sic
                     st.session_state.mgr_step = 'main'
@@ -596,19 +873,10 @@ elif mode == "👥 매니저 관리":
 
         slc = st.session_state.mgr_code
 
-        # 매니저 이름
-        mgr_name = ""
-        if mn_col in df_merged.columns and mc_col in df_merged.columns:
-            mdf = df_merged[get_clean_series(df_merged, mc_col) == slc]
-            if not mdf.empty and mn_col in mdf.columns:
-                mgr_name = _clean_excel_text(safe_str(mdf[mn_col].values[0]))
-
-        # 소속 설계사 코드 목록
-        my_agents = set()
-        if mc_col in df_merged.columns and ac_col in df_merged.columns:
-            mask = get_clean_series(df_merged, mc_col) == slc
-            for ac in get_clean_series(df_merged, ac_col)[mask]:
-                if ac: my_agents.add(ac)
+        # 매니저 이름 · 소속 설계사 코드 목록
+        mgr = mgr_idx.get(slc, {})
+        mgr_name = mgr.get('name', "")
+        my_agents = set(mgr.get('agents', []))
 
         step = st.session_state.get('mgr_step', 'main')
 
@@ -631,35 +899,18 @@ elif mode == "👥 매니저 관리":
                 st.session_state.mgr_step = 'main'
                 st.rerun()
             cat = st.session_state.mgr_category
-            ranges = {500000: (300000, float('inf')), 300000: (200000, 300000),
-                      200000: (100000, 200000), 100000: (0, 100000)}
-            counts = {k: 0 for k in ranges}
-
-            for ac in my_agents:
-                cr, _ = calculate_agent_performance(ac, df_merged, ps)
-                matched_tiers = set()
-                for res in cr:
-                    if cat == "구간" and "구간" not in res['type']: continue
-                    if cat == "브릿지" and "브릿지" not in res['type']: continue
-                    val = res.get('val', res.get('val_prev', res.get('val_curr', 0.0))) or 0
-                    for t, (mn, mx) in ranges.items():
-                        if mn <= val < mx:
-                            matched_tiers.add(t)
-                            break
-                for t in matched_tiers:
-                    counts[t] += 1
+            folders = tier_idx.get((slc, cat), {})
 
             st.markdown(f"<h3 class='main-title'>📁 {cat}실적 근접자 조회 (소속: 총 {len(my_agents)}명)</h3>", unsafe_allow_html=True)
-            for t, (mn, mx) in ranges.items():
-                ct = counts[t]
-                if t == 500000:
-                    lbl = f"📁 50만 구간 근접 및 달성 (30만 이상) - 총 {ct}명"
+            for t, mn, mx in tier_ranges(mgr_tiers):
+                ct = len(folders.get(t, []))
+                if mx == float('inf'):
+                    lbl = f"📁 {int(t//10000)}만 구간 근접 및 달성 ({int(mn//10000)}만 이상) - 총 {ct}명"
                 else:
                     lbl = f"📁 {int(t//10000)}만 구간 근접자 ({int(mn//10000)}만~{int(mx//10000)}만) - 총 {ct}명"
                 if st.button(lbl, use_container_width=True, key=f"t_{t}"):
                     st.session_state.mgr_step = 'list'
                     st.session_state.mgr_target = t
-                    st.session_state.mgr_min_v = mn
                     st.session_state.mgr_max_v = mx
                     st.rerun()
 
@@ -669,40 +920,19 @@ elif mode == "👥 매니저 관리":
                 st.rerun()
             cat = st.session_state.mgr_category
             target = st.session_state.mgr_target
-            min_v = st.session_state.mgr_min_v
             max_v = st.session_state.mgr_max_v
 
-            if target == 500000:
-                st.markdown("<h3 class='main-title'>👥 50만 구간 근접 및 달성자 명단</h3>", unsafe_allow_html=True)
+            if max_v == float('inf'):
+                st.markdown(f"<h3 class='main-title'>👥 {int(target//10000)}만 구간 근접 및 달성자 명단</h3>", unsafe_allow_html=True)
             else:
                 st.markdown(f"<h3 class='main-title'>👥 {int(target//10000)}만 구간 근접자 명단</h3>", unsafe_allow_html=True)
             st.info("💡 이름을 클릭하면 상세 실적을 확인하고 카톡으로 전송할 수 있습니다.")
 
-            near = []
-            for code in my_agents:
-                cr, _ = calculate_agent_performance(code, df_merged, ps)
-                # 이름/소속 가져오기
-                aname = "이름없음"
-                agency = ""
-                if an_col in df_merged.columns and ac_col in df_merged.columns:
-                    m = df_merged[get_clean_series(df_merged, ac_col) == code]
-                    if not m.empty:
-                        aname = _clean_excel_text(safe_str(m[an_col].values[0]))
-                        if ag_col in m.columns:
-                            agency = _clean_excel_text(safe_str(m[ag_col].values[0]))
-
-                for res in cr:
-                    if cat == "구간" and "구간" not in res['type']: continue
-                    if cat == "브릿지" and "브릿지" not in res['type']: continue
-                    val = res.get('val', res.get('val_prev', res.get('val_curr', 0.0))) or 0
-                    if min_v <= val < max_v:
-                        near.append((code, aname, agency, val))
-                        break
+            near = tier_idx.get((slc, cat), {}).get(target, [])
 
             if not near:
                 st.info("해당 구간에 소속 설계사가 없습니다.")
             else:
-                near.sort(key=lambda x: (x[2], x[1]))
                 for code, name, agency, val in near:
                     if st.button(f"👤 [{agency}] {name} 설계사님 (현재 {val:,.0f}원)", use_container_width=True, key=f"btn_{code}"):
                         st.session_state.mgr_selected_code = code
@@ -718,8 +948,8 @@ elif mode == "👥 매니저 관리":
             name = st.session_state.mgr_selected_name
             st.markdown("<div class='detail-box'>", unsafe_allow_html=True)
             st.markdown(f"<h4 class='agent-title'>👤 {name} 설계사님</h4>", unsafe_allow_html=True)
-            cr, tp = calculate_agent_performance(code, df_merged, ps)
-            render_ui_cards(name, cr, tp, data_date, show_share=True)
+            cr, tp = calculate_agent_performance(code, df_merged, ps, agent_idx, num_view)
+            render_ui_cards(name, cr, tp, data_date, show_share=True, agent_code=code, data_ver=data_ver)
             st.markdown("</div>", unsafe_allow_html=True)
 
 # ──────────────────────────────────────────
@@ -735,6 +965,11 @@ elif mode == "⚙️ 시스템 관리자":
 
     if st.button("🔄 데이터 캐시 초기화 (파일 교체 후 사용)", type="primary"):
         st.cache_data.clear()
+        build_data_index.clear()
+        data_catalog.clear()
+        compute_prize_table.clear()
+        build_numeric_view.clear()
+        build_tier_index.clear()
         st.rerun()
 
     st.header("📁 로드된 데이터")
@@ -775,7 +1010,9 @@ elif mode == "⚙️ 시스템 관리자":
         "상품": "상품 추가",
         "상품추가": "상품 추가2",
         "유퍼간편": "유퍼스트"
-      }
+      },
+      "mgr_tiers": [[500000, 300000], [300000, 200000], [200000, 100000], [100000, 0]]
     }
     ```
+    `mgr_tiers`는 매니저 폴더 구간입니다 — `[목표 금액, 하한]` 목록 (상한은 바로 위 구간의 하한, 목표 금액은 겹치지 않게).
     """)
@@ -26,6 +26,7 @@ st.set_page_config(page_title="GA3본부 시상 관리 시스템", layout="wide"
 
 DATA_DIR = "data"
 SETTINGS_FILE = "settings.json"
+TABLE_FRAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "table_frame")
 
 # ═══════════════════════════════════════════════════════
 # 0. CSS (메리츠 스타일)
@@ -77,7 +78,11 @@ DEFAULT_SETTINGS = {
         "상품": "상품 추가",
         "상품추가": "상품 추가2",
         "유퍼간편": "유퍼스트"
-    }
+    },
+    # True: 복사 텍스트·시상 팝업을 행 클릭 시 서버에서 생성 (인원 많은 매니저용)
+    "lazy_table": False,
+    # 이 인원 이상이면 보이는 행/카드만 그리는 가상 스크롤 테이블 사용 (0: 끔)
+    "virtual_table_rows": 300
 }
 
 def load_settings():
@@ -99,14 +104,30 @@ def load_settings():
 # ═══════════════════════════════════════════════════════
 # 2. 데이터 로딩
 # ═══════════════════════════════════════════════════════
+_EXCEL_ESC = re.compile(r'_x([0-9a-fA-F]{4})_')
+
+def _decode_match(m):
+    try: return chr(int(m.group(1), 16))
+    except: return m.group(0)
+
 def decode_excel_text(val):
     if pd.isna(val): return val
     val_str = str(val)
     if '_x' not in val_str: return val_str
-    def decode_match(m):
-        try: return chr(int(m.group(1), 16))
-        except: return m.group(0)
-    return re.sub(r'_x([0-9a-fA-F]{4})_', decode_match, val_str)
+    return _EXCEL_ESC.sub(_decode_match, val_str)
+
+def decode_excel_frame(df):
+    """문자열 컬럼 일괄 디코딩 — decode_excel_text를 셀마다 적용한 것과 같은 결과.
+    _x가 들어 있는 컬럼만 str.replace로 처리한다."""
+    for col in df.columns:
+        s = df[col]
+        if not (s.dtype == 'object' or pd.api.types.is_string_dtype(s)): continue
+        na = s.isna()
+        txt = s.astype(str)
+        if txt.str.contains('_x', regex=False, na=False).any():
+            txt = txt.str.replace(_EXCEL_ESC, _decode_match, regex=True)
+        df[col] = txt.where(~na, s)
+    return df
 
 def clean_key(val):
     if pd.isna(val) or str(val).strip().lower() == 'nan': return ""
@@ -139,16 +160,21 @@ def find_latest_files():
 
     return sum_path, bridge_path, data_date
 
+def data_version(sum_path, bridge_path):
+    """파일명 + 수정시각 기반 데이터 버전 문자열 (캐시 키)"""
+    parts = []
+    for p in (sum_path, bridge_path):
+        if p and os.path.exists(p):
+            parts.append(f"{os.path.basename(p)}@{os.path.getmtime(p)}")
+    return "|".join(parts)
+
 @st.cache_data(show_spinner="데이터를 로딩하고 있습니다...")
-def load_and_merge(_sum_path, _bridge_path):
-    """두 Excel 파일을 읽고 설계사코드 기준으로 병합."""
+def load_and_merge(_sum_path, _bridge_path, data_ver=None):
+    """두 Excel 파일을 읽고 설계사코드 기준으로 병합. (data_ver가 바뀌면 다시 읽음)"""
     def _read(path):
         df = pd.read_excel(path)
         df.columns = [decode_excel_text(c) if isinstance(c, str) else c for c in df.columns]
-        for col in df.columns:
-            if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
-                df[col] = df[col].apply(decode_excel_text)
-        return df
+        return decode_excel_frame(df)
 
     df_sum = _read(_sum_path)
     merge_col = '대리점설계사조직코드'
@@ -172,11 +198,84 @@ def _safe_float(val):
     try: return float(str(val).replace(',', '').strip())
     except: return 0.0
 
+def _safe_float_array(series):
+    """_safe_float의 컬럼 버전 — Series → float64 ndarray (결측/변환 불가 → 0)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype('float64').fillna(0.0).to_numpy()
+    s = series.astype(str).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(s, errors='coerce').astype('float64').fillna(0.0).to_numpy()
+
+@st.cache_resource(show_spinner=False)
+def build_numeric_view(_df, ps, data_ver=None):
+    """시상 플랜(ps)의 숫자 컬럼(실적/대상/예정금/시상금/부족금액/목표)을
+    데이터 버전당 한 번만 float64로 변환. Returns {컬럼명: 읽기 전용 ndarray (전체 행)}"""
+    view = {}
+    for c in ps['num_cols']:
+        arr = _safe_float_array(_df.iloc[:, ps['pos'][c]])
+        arr.setflags(write=False)
+        view[c] = arr
+    return view
+
+@st.cache_resource(show_spinner=False)
+def build_manager_index(_df, manager_col, data_ver=None):
+    """매니저 코드 인덱스 — 데이터 버전당 한 번 생성.
+    Returns {'rows': {정규화 코드: 읽기 전용 행 위치 배열}, 'keys': 정렬된 고유 코드 리스트}"""
+    keys = _df[manager_col].apply(clean_key).to_numpy()
+    rows = {}
+    for k, pos in pd.Series(keys).groupby(keys).indices.items():
+        pos = np.asarray(pos, dtype=np.intp)
+        pos.setflags(write=False)
+        rows[k] = pos
+    return {'rows': rows, 'keys': sorted(rows)}
+
+def find_manager_rows(mgr_index, code_clean):
+    """정확히 일치하는 코드의 행 위치. 없으면 코드 일부가 포함된 매니저들의 행 (원래 순서)"""
+    rows = mgr_index['rows'].get(code_clean)
+    if rows is not None:
+        return rows
+    hits = [mgr_index['rows'][k] for k in mgr_index['keys'] if code_clean in k]
+    return np.sort(np.concatenate(hits)) if hits else np.array([], dtype=np.intp)
+
 
 # ═══════════════════════════════════════════════════════
 # 3. 시상 구조 자동 감지 엔진
 # ═══════════════════════════════════════════════════════
 def detect_prize_structure(df, settings):
+    """컬럼 구성 + 라벨 설정이 같으면 캐시된 시상 플랜을 그대로 사용 (파일 버전당 1회 감지)"""
+    labels = settings.get('prize_labels', DEFAULT_SETTINGS['prize_labels'])
+    return compile_prize_plan(tuple(df.columns), json.dumps(labels, ensure_ascii=False, sort_keys=True))
+
+@st.cache_resource(show_spinner=False)
+def compile_prize_plan(columns, labels_json):
+    """시상 구조 감지 + 숫자 컬럼 목록/위치 확정. 반환 dict는 세션 간 공유되므로 수정 금지.
+    Returns: _detect_prize_structure 결과 +
+        num_cols: 숫자로 읽을 컬럼 목록 (build_numeric_view → build_display/_build_prize_details의 num)
+        pos: {컬럼명: 프레임 내 위치}
+    """
+    ps = _detect_prize_structure(set(columns), json.loads(labels_json))
+
+    cols = ['시상금계', '추가예정금계', '시상금계and추가예정금계']
+    for info in ps['weeks'].values():
+        cols.append(info['perf_col'])
+        for p in info['prizes']:
+            cols += [p['elig_col'], p['prize_col']]
+    for comb in ps.get('combined', []):
+        cols += [comb['elig_col'], comb['prize_col']]
+    if ps['cumulative']:
+        cols += [ps['cumulative']['perf_col'], ps['cumulative']['elig_col'], ps['cumulative']['prize_col']]
+    for key in ('bridge', 'consecutive'):
+        x = ps[key]
+        if x: cols += [x['prev_perf'], x['curr_perf'], x['prize_col'], x.get('shortfall_col'), x.get('target_col')]
+    if ps['next_bridge']:
+        nb = ps['next_bridge']
+        cols += [nb['perf_col'], nb.get('target_col'), nb.get('shortfall_col')]
+
+    pos = {c: i for i, c in enumerate(columns)}
+    ps['num_cols'] = [c for c in dict.fromkeys(cols) if c and c in pos]
+    ps['pos'] = pos
+    return ps
+
+def _detect_prize_structure(cols, labels):
     """컬럼명 패턴을 분석하여 시상 구조를 자동 생성.
     Returns dict:
         weeks: {N: {"perf_col", "prizes": [{"label", "elig_col", "prize_col"}]}}
@@ -186,8 +285,6 @@ def detect_prize_structure(df, settings):
         consecutive: {...} or None
         next_bridge: {...} or None
     """
-    cols = set(df.columns)
-    labels = settings.get('prize_labels', DEFAULT_SETTINGS['prize_labels'])
 
     # ── 주차별 시상 감지 ──
     # 대상 컬럼 패턴: 추가13회예정금_{N}주대상, 추가13회예정금_{N}주대상_상품 등
@@ -337,12 +434,19 @@ def detect_prize_structure(df, settings):
 # ═══════════════════════════════════════════════════════
 # 4. 표시용 DataFrame 빌더 + 시상금 계산
 # ═══════════════════════════════════════════════════════
-def build_display(my_df, ps, settings):
+def build_display(my_df, ps, settings, nums=None):
     """자동 감지된 구조(ps)를 바탕으로 표시용 DataFrame,
     컬럼 그룹, 시상금 맵을 생성.
+    nums: my_df 행 순서에 맞춘 숫자 뷰 {컬럼: ndarray} (build_numeric_view 참고)
 
     Returns: (display_df, col_groups, prize_data_map)
     """
+    nums = nums or {}
+
+    def num(col):
+        if col in nums: return pd.Series(nums[col], index=my_df.index)
+        return pd.to_numeric(my_df[col].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+
     out = pd.DataFrame(index=my_df.index)
 
     # 기본 정보
@@ -367,7 +471,7 @@ def build_display(my_df, ps, settings):
         has_any = False
         for p in info['prizes']:
             if p['prize_col'] in my_df.columns:
-                vals = pd.to_numeric(my_df[p['prize_col']].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+                vals = num(p['prize_col'])
                 prize_sum += vals
                 has_any = True
         if has_any:
@@ -381,10 +485,10 @@ def build_display(my_df, ps, settings):
     for comb in ps.get('combined', []):
         if comb['prize_col'] in my_df.columns:
             label = f"{comb['label']} 시상"
-            vals = pd.to_numeric(my_df[comb['prize_col']].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+            vals = num(comb['prize_col'])
             # 대상 체크
             if comb['elig_col'] in my_df.columns:
-                elig = pd.to_numeric(my_df[comb['elig_col']].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+                elig = num(comb['elig_col'])
                 vals = vals.where(elig != 0, 0)
             out[label] = vals
 
@@ -397,9 +501,9 @@ def build_display(my_df, ps, settings):
         out['기본 시상'] = my_df['시상금계']
         cumul_grp.append('기본 시상')
     if ps['cumulative'] and ps['cumulative']['prize_col'] in my_df.columns:
-        vals = pd.to_numeric(my_df[ps['cumulative']['prize_col']].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+        vals = num(ps['cumulative']['prize_col'])
         if ps['cumulative']['elig_col'] in my_df.columns:
-            elig = pd.to_numeric(my_df[ps['cumulative']['elig_col']].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+            elig = num(ps['cumulative']['elig_col'])
             vals = vals.where(elig != 0, 0)
         out['추가 누계'] = vals
         cumul_grp.append('추가 누계')
@@ -466,13 +570,13 @@ def build_display(my_df, ps, settings):
     # ── 총 시상금 계산 ──
     total = pd.Series(0.0, index=my_df.index)
     if '시상금계and추가예정금계' in my_df.columns:
-        total += pd.to_numeric(my_df['시상금계and추가예정금계'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+        total += num('시상금계and추가예정금계')
     elif '시상금계' in my_df.columns:
-        total += pd.to_numeric(my_df['시상금계'].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+        total += num('시상금계')
     if ps['bridge'] and ps['bridge']['prize_col'] in my_df.columns:
-        total += pd.to_numeric(my_df[ps['bridge']['prize_col']].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+        total += num(ps['bridge']['prize_col'])
     if ps['consecutive'] and ps['consecutive']['prize_col'] in my_df.columns:
-        total += pd.to_numeric(my_df[ps['consecutive']['prize_col']].astype(str).str.replace(',', ''), errors='coerce').fillna(0)
+        total += num(ps['consecutive']['prize_col'])
     out['총 시상금'] = total
 
     # ── 순번 삽입 ──
@@ -483,14 +587,10 @@ def build_display(my_df, ps, settings):
     for c in out.columns:
         if c in skip_fmt:
             continue
-        out[c] = out[c].apply(_format_cell)
+        out[c] = _format_column(out[c])
 
     # ── 시상 상세 맵 (팝업/카톡용) ──
-    prize_data_map = {}
-    for row_idx, (orig_idx, row) in enumerate(my_df.iterrows()):
-        details = _build_prize_details(row, ps)
-        if details['total'] > 0:
-            prize_data_map[row_idx] = details
+    prize_data_map = _build_prize_details(my_df, ps, nums)
 
     return out, col_groups, prize_data_map
 
@@ -506,81 +606,119 @@ def _format_cell(val):
         s = str(val).strip()
         return '' if s in ('0', '0.0', 'nan') else s
 
-def _build_prize_details(row, ps):
-    """한 행(설계사)에 대한 시상 상세 내역 구성."""
-    weekly_items = []
+def _format_column(s):
+    """열 단위 _format_cell — 결과는 셀마다 적용한 것과 동일.
+    숫자 열은 NumPy 마스크(결측·0 → 빈칸, 정수/소수 구분)로, 그 외 열은 고유 문자열만 _format_cell."""
+    if s.empty: return s
+    if s.dtype.kind in 'iu' or s.dtype == np.float64 or str(s.dtype) == 'Float64':
+        v = s.to_numpy(dtype='float64', na_value=np.nan)
+        out = np.full(len(v), '', dtype=object)
+        show = ~np.isnan(v) & (v != 0)
+        u, inv = np.unique(v[show], return_inverse=True)
+        fin = np.isfinite(u)
+        whole = fin & (u == np.floor(np.where(fin, u, 0)))
+        frac = fin & ~whole
+        fmt = np.empty(len(u), dtype=object)
+        fmt[whole] = [f'{int(x):,}' for x in u[whole]]
+        fmt[frac] = [f'{x:,.1f}' for x in u[frac]]
+        fmt[~fin] = [str(x) for x in u[~fin]]
+        out[show] = fmt[inv]
+        return pd.Series(out, index=s.index, name=s.name)
+    vals = s.to_numpy(dtype=object)
+    keep = ~pd.isna(vals)
+    out = np.full(len(vals), '', dtype=object)
+    codes, uniq = pd.factorize(pd.Series(vals[keep], dtype=object).astype(str))
+    out[keep] = np.array([_format_cell(t) for t in uniq], dtype=object)[codes]
+    return pd.Series(out, index=s.index, name=s.name)
+
+def _build_prize_details(my_df, ps, nums=None):
+    """설계사별 시상 상세 내역 구성 (컬럼 단위 계산).
+    총 시상금이 있는 행만 dict로 만든다. Returns {행 순번: details}"""
+    n = len(my_df)
+    cols = my_df.columns
+    nums = nums or {}
+
+    def num(col, default=0.0):
+        # row.get(col, default)와 동일 — 컬럼이 없으면 기본값
+        if col is None or col not in cols:
+            return np.full(n, float(default))
+        if col in nums: return nums[col]
+        return _safe_float_array(my_df[col])
+
+    week_cols = []
     for w, info in ps['weeks'].items():
-        week_prizes = []
-        for p in info['prizes']:
-            if p['prize_col'] not in row.index: continue
-            elig = _safe_float(row.get(p['elig_col'], 1))
-            if elig == 0: continue
-            amt = _safe_float(row.get(p['prize_col'], 0))
-            if amt > 0:
-                week_prizes.append({'label': p['label'], 'amount': amt})
-        perf = _safe_float(row.get(info['perf_col'], 0)) if info['perf_col'] else 0
-        if week_prizes or perf > 0:
-            weekly_items.append({
-                'week': w, 'perf': perf,
-                'prizes': week_prizes,
-                'subtotal': sum(p['amount'] for p in week_prizes)
-            })
-
-    combined_items = []
-    for comb in ps.get('combined', []):
-        if comb['prize_col'] not in row.index: continue
-        elig = _safe_float(row.get(comb['elig_col'], 1))
-        if elig == 0: continue
-        amt = _safe_float(row.get(comb['prize_col'], 0))
-        if amt > 0:
-            combined_items.append({'label': comb['label'], 'amount': amt})
-
-    cumul_amt = 0
-    if ps['cumulative'] and ps['cumulative']['prize_col'] in row.index:
-        elig = _safe_float(row.get(ps['cumulative']['elig_col'], 1))
-        if elig != 0:
-            cumul_amt = _safe_float(row.get(ps['cumulative']['prize_col'], 0))
-
-    base_prize = _safe_float(row.get('시상금계', 0))
-    extra_prize = _safe_float(row.get('추가예정금계', 0))
-
-    bridge_info = None
-    if ps['bridge']:
-        b = ps['bridge']
-        bp = _safe_float(row.get(b['prize_col'], 0))
-        bridge_info = {
-            'prev': _safe_float(row.get(b['prev_perf'], 0)) if b['prev_perf'] else 0,
-            'curr': _safe_float(row.get(b['curr_perf'], 0)) if b['curr_perf'] else 0,
-            'prize': bp,
-            'shortfall': _safe_float(row.get(b.get('shortfall_col', ''), 0)),
-            'target': _safe_float(row.get(b.get('target_col', ''), 0)),
-            'label_prev': b['label_prev'], 'label_curr': b['label_curr'],
-        }
+        items = [(p['label'], num(p['elig_col'], 1), num(p['prize_col']))
+                 for p in info['prizes'] if p['prize_col'] in cols]
+        perf = num(info['perf_col']) if info['perf_col'] else None
+        week_cols.append((w, perf, items))
 
-    consec_info = None
-    if ps['consecutive']:
-        c = ps['consecutive']
-        cp = _safe_float(row.get(c['prize_col'], 0))
-        consec_info = {
-            'prev': _safe_float(row.get(c['prev_perf'], 0)) if c['prev_perf'] else 0,
-            'curr': _safe_float(row.get(c['curr_perf'], 0)) if c['curr_perf'] else 0,
-            'prize': cp,
-            'shortfall': _safe_float(row.get(c.get('shortfall_col', ''), 0)),
-            'target': _safe_float(row.get(c.get('target_col', ''), 0)),
-            'label_prev': c['label_prev'], 'label_curr': c['label_curr'],
-        }
+    comb_cols = [(comb['label'], num(comb['elig_col'], 1), num(comb['prize_col']))
+                 for comb in ps.get('combined', []) if comb['prize_col'] in cols]
+
+    cumul = None
+    if ps['cumulative'] and ps['cumulative']['prize_col'] in cols:
+        cumul = (num(ps['cumulative']['elig_col'], 1), num(ps['cumulative']['prize_col']))
 
+    base_prize = num('시상금계')
+    extra_prize = num('추가예정금계')
     total = base_prize + extra_prize
-    if bridge_info: total += bridge_info['prize']
-    if consec_info: total += consec_info['prize']
 
-    return {
-        'weekly': weekly_items, 'combined': combined_items,
-        'cumul_amt': cumul_amt, 'base_prize': base_prize,
-        'extra_prize': extra_prize,
-        'bridge': bridge_info, 'consecutive': consec_info,
-        'total': total,
-    }
+    def link_cols(x):
+        # 브릿지/연속가동 공통 컬럼 (prev/curr 컬럼이 없으면 정수 0 유지)
+        if not x: return None
+        return {
+            'prev': num(x['prev_perf']) if x['prev_perf'] else None,
+            'curr': num(x['curr_perf']) if x['curr_perf'] else None,
+            'prize': num(x['prize_col']),
+            'shortfall': num(x.get('shortfall_col', '')),
+            'target': num(x.get('target_col', '')),
+            'label_prev': x['label_prev'], 'label_curr': x['label_curr'],
+        }
+    bridge = link_cols(ps['bridge'])
+    consec = link_cols(ps['consecutive'])
+    if bridge: total = total + bridge['prize']
+    if consec: total = total + consec['prize']
+
+    def link_info(x, i):
+        if x is None: return None
+        return {
+            'prev': float(x['prev'][i]) if x['prev'] is not None else 0,
+            'curr': float(x['curr'][i]) if x['curr'] is not None else 0,
+            'prize': float(x['prize'][i]),
+            'shortfall': float(x['shortfall'][i]),
+            'target': float(x['target'][i]),
+            'label_prev': x['label_prev'], 'label_curr': x['label_curr'],
+        }
+
+    details_map = {}
+    for i in np.flatnonzero(total > 0):
+        weekly_items = []
+        for w, perf, items in week_cols:
+            week_prizes = [{'label': lbl, 'amount': float(amt[i])}
+                           for lbl, elig, amt in items if elig[i] != 0 and amt[i] > 0]
+            pv = float(perf[i]) if perf is not None else 0
+            if week_prizes or pv > 0:
+                weekly_items.append({
+                    'week': w, 'perf': pv,
+                    'prizes': week_prizes,
+                    'subtotal': sum(p['amount'] for p in week_prizes)
+                })
+
+        combined_items = [{'label': lbl, 'amount': float(amt[i])}
+                          for lbl, elig, amt in comb_cols if elig[i] != 0 and amt[i] > 0]
+
+        cumul_amt = 0
+        if cumul is not None and cumul[0][i] != 0:
+            cumul_amt = float(cumul[1][i])
+
+        details_map[int(i)] = {
+            'weekly': weekly_items, 'combined': combined_items,
+            'cumul_amt': cumul_amt, 'base_prize': float(base_prize[i]),
+            'extra_prize': float(extra_prize[i]),
+            'bridge': link_info(bridge, i), 'consecutive': link_info(consec, i),
+            'total': float(total[i]),
+        }
+    return details_map
 
 
 # ═══════════════════════════════════════════════════════
@@ -705,9 +843,54 @@ def build_prize_popup_html(details):
 # ═══════════════════════════════════════════════════════
 # 7. HTML 테이블 렌더링 (데스크탑 + 모바일)
 # ═══════════════════════════════════════════════════════
-def render_html_table(df, col_groups, prize_data_map, data_date, footer):
-    """DataFrame → 반응형 HTML 테이블 (정렬/틀고정/카드뷰/복사/시상팝업)"""
-    table_id = f"pt_{uuid.uuid4().hex[:8]}"
+def row_clip_text(df, row_idx, prize_data_map, data_date, footer):
+    """테이블 한 행의 카톡 복사 텍스트"""
+    if row_idx in prize_data_map:
+        details = prize_data_map[row_idx]
+    else:
+        details = {'total': 0, 'weekly': [], 'combined': [], 'base_prize': 0,
+                   'extra_prize': 0, 'bridge': None, 'consecutive': None, 'cumul_amt': 0}
+    return build_clip_text(df.iloc[row_idx].to_dict(), details, data_date, footer)
+
+
+def row_prize_html(prize_data_map, row_idx):
+    """테이블 한 행의 시상 팝업 HTML (시상 없으면 '')"""
+    if row_idx in prize_data_map:
+        return build_prize_popup_html(prize_data_map[row_idx])
+    return ''
+
+
+def _card_prize_html(details):
+    """모바일 카드 하단 시상금 요약"""
+    h_prize = '<div style="margin-top:8px;padding:10px;background:#fff8f0;border-radius:10px;border:1px solid #ffd4a8;">'
+    h_prize += f'<div style="font-weight:800;color:#d9232e;font-size:15px;margin-bottom:4px">💰 총 시상금: {details["total"]:,.0f}원</div>'
+    # 간략 합계
+    parts = []
+    if details['base_prize'] > 0: parts.append(f"기본 {details['base_prize']:,.0f}")
+    if details['extra_prize'] > 0: parts.append(f"추가 {details['extra_prize']:,.0f}")
+    if details.get('bridge') and details['bridge']['prize'] > 0: parts.append(f"브릿지 {details['bridge']['prize']:,.0f}")
+    if details.get('consecutive') and details['consecutive']['prize'] > 0: parts.append(f"연속 {details['consecutive']['prize']:,.0f}")
+    if parts:
+        h_prize += f'<div style="font-size:11px;color:#888;margin-bottom:6px">({" + ".join(parts)})</div>'
+    h_prize += '</div>'
+    return h_prize
+
+
+def _text_width(s):
+    """대략적인 표시 폭 (한글 등 전각 2칸)"""
+    return sum(2 if ord(ch) > 127 else 1 for ch in s)
+
+
+def render_html_table(df, col_groups, prize_data_map, data_date, footer, lazy=False, virtual=False):
+    """DataFrame → 반응형 HTML 테이블 (정렬/틀고정/카드뷰/복사/시상팝업)
+
+    lazy=True 이면 복사 텍스트·시상 팝업을 싣지 않고, 행을 누를 때
+    table_frame 컴포넌트로 서버에 요청한다 (render_lazy_table 참고).
+    virtual=True 이면 행/카드 HTML 대신 열 배열만 싣고, 브라우저가
+    보이는 구간의 행과 카드만 그린다 (인원 많은 매니저용).
+    """
+    # lazy 모드는 재실행마다 같은 HTML이어야 프레임이 다시 그려지지 않음
+    table_id = "pt_lazy" if lazy else f"pt_{uuid.uuid4().hex[:8]}"
     columns = list(df.columns)
     num_cols = len(columns)
     shortfall_cols = {c for c in columns if '부족' in c}
@@ -757,26 +940,13 @@ def render_html_table(df, col_groups, prize_data_map, data_date, footer):
 
     grp_h, col_h = 30, 36
 
-    # ── 클립보드 텍스트 생성 ──
-    clip_texts = []
-    for row_idx, (_, row) in enumerate(df.iterrows()):
-        if row_idx in prize_data_map:
-            details = prize_data_map[row_idx]
-        else:
-            details = {'total': 0, 'weekly': [], 'combined': [], 'base_prize': 0,
-                       'extra_prize': 0, 'bridge': None, 'consecutive': None, 'cumul_amt': 0}
-        clip_texts.append(build_clip_text(row.to_dict(), details, data_date, footer))
-
-    clip_b64 = base64.b64encode(json.dumps(clip_texts, ensure_ascii=False).encode('utf-8')).decode('ascii')
+    # ── 클립보드 텍스트 / 시상 팝업 HTML 생성 (lazy 모드는 요청 시 서버에서) ──
+    if not lazy:
+        clip_texts = [row_clip_text(df, i, prize_data_map, data_date, footer) for i in range(len(df))]
+        clip_b64 = base64.b64encode(json.dumps(clip_texts, ensure_ascii=False).encode('utf-8')).decode('ascii')
 
-    # ── 시상 팝업 HTML 생성 ──
-    prize_htmls = []
-    for row_idx in range(len(df)):
-        if row_idx in prize_data_map:
-            prize_htmls.append(build_prize_popup_html(prize_data_map[row_idx]))
-        else:
-            prize_htmls.append('')
-    prize_b64 = base64.b64encode(json.dumps(prize_htmls, ensure_ascii=False).encode('utf-8')).decode('ascii')
+        prize_htmls = [row_prize_html(prize_data_map, i) for i in range(len(df))]
+        prize_b64 = base64.b64encode(json.dumps(prize_htmls, ensure_ascii=False).encode('utf-8')).decode('ascii')
 
     # ══════════════════════ HTML 빌드 ══════════════════════
     mob_font = max(9, base_font - 2)
@@ -852,7 +1022,15 @@ def render_html_table(df, col_groups, prize_data_map, data_date, footer):
         html += f'<th class="{f_cls}" data-col="{i}" onclick="sortT(this)">{bar}{col} <span class="sa">▲▼</span></th>'
     html += '<th data-col="-1" style="min-width:50px;cursor:default">복사</th></tr></thead><tbody>'
 
-    for row_idx, (_, row) in enumerate(df.iterrows()):
+    if virtual:
+        # 열 폭 고정용 숨김 행 (열별 가장 긴 값) — 스크롤해도 열 폭이 흔들리지 않음
+        html += '<tr class="vz">'
+        for i, col in enumerate(columns):
+            vals = ["" if pd.isna(v) else str(v) for v in df[col].tolist()]
+            widest = max(vals + [str(len(df))], key=_text_width)
+            html += f'<td data-col="{i}">{widest}</td>'
+        html += '<td data-col="-1"><button class="dcopy">📋</button><button class="dcopy" style="margin-left:2px">💰</button></td></tr>'
+    for row_idx, (_, row) in enumerate(df.iterrows() if not virtual else []):
         html += '<tr>'
         for i, col in enumerate(columns):
             val = row[col]
@@ -867,8 +1045,8 @@ def render_html_table(df, col_groups, prize_data_map, data_date, footer):
     html += '</tbody></table></div></div>'
 
     # ── 모바일 카드 뷰 ──
-    html += '<div class="mv">'
-    for row_idx, (_, row) in enumerate(df.iterrows()):
+    html += f'<div class="mv vm" id="mv_{table_id}">' if virtual else '<div class="mv">'
+    for row_idx, (_, row) in enumerate(df.iterrows() if not virtual else []):
         name_val = str(row.get('설계사명', '')) if '설계사명' in columns else ''
         agency_val = str(row.get('지사', '')) if '지사' in columns else ''
         num_val = str(row.get('순번', row_idx + 1)) if '순번' in columns else str(row_idx + 1)
@@ -917,19 +1095,7 @@ def render_html_table(df, col_groups, prize_data_map, data_date, footer):
 
         # 시상 카드 (모바일)
         if row_idx in prize_data_map:
-            details = prize_data_map[row_idx]
-            h_prize = '<div style="margin-top:8px;padding:10px;background:#fff8f0;border-radius:10px;border:1px solid #ffd4a8;">'
-            h_prize += f'<div style="font-weight:800;color:#d9232e;font-size:15px;margin-bottom:4px">💰 총 시상금: {details["total"]:,.0f}원</div>'
-            # 간략 합계
-            parts = []
-            if details['base_prize'] > 0: parts.append(f"기본 {details['base_prize']:,.0f}")
-            if details['extra_prize'] > 0: parts.append(f"추가 {details['extra_prize']:,.0f}")
-            if details.get('bridge') and details['bridge']['prize'] > 0: parts.append(f"브릿지 {details['bridge']['prize']:,.0f}")
-            if details.get('consecutive') and details['consecutive']['prize'] > 0: parts.append(f"연속 {details['consecutive']['prize']:,.0f}")
-            if parts:
-                h_prize += f'<div style="font-size:11px;color:#888;margin-bottom:6px">({" + ".join(parts)})</div>'
-            h_prize += '</div>'
-            html += h_prize
+            html += _card_prize_html(prize_data_map[row_idx])
 
         html += '</div></div>'
     html += '</div>'
@@ -951,8 +1117,26 @@ def render_html_table(df, col_groups, prize_data_map, data_date, footer):
 </div></div>
 """
 
-    html += f'<div id="__cb" style="display:none">{clip_b64}</div>'
-    html += f'<div id="__pb" style="display:none">{prize_b64}</div>'
+    if not lazy:
+        html += f'<div id="__cb" style="display:none">{clip_b64}</div>'
+        html += f'<div id="__pb" style="display:none">{prize_b64}</div>'
+
+    if virtual:
+        # 열 배열 + 렌더용 메타 (행 HTML은 브라우저에서 생성)
+        vdata = {
+            'h': columns,
+            'c': [["" if pd.isna(v) else str(v) for v in df[col].tolist()] for col in columns],
+            'g': [col_to_group.get(c) for c in columns],
+            'gc': group_color_map,
+            'sc': [c in shortfall_cols for c in columns],
+            'm': {str(i): _card_prize_html(d) for i, d in prize_data_map.items()},
+            'ni': columns.index('순번') if '순번' in columns else -1,
+            'nm': columns.index('설계사명') if '설계사명' in columns else -1,
+            'ai': columns.index('지사') if '지사' in columns else -1,
+            'ti': columns.index('총 시상금') if '총 시상금' in columns else -1,
+        }
+        vd_b64 = base64.b64encode(json.dumps(vdata, ensure_ascii=False).encode('utf-8')).decode('ascii')
+        html += f'<div id="__vd" style="display:none">{vd_b64}</div>'
 
     html += f"""
 <script>
@@ -973,10 +1157,82 @@ var ss={{}};
 function sortT(th){{var t=document.getElementById("{table_id}"),tb=t.querySelector("tbody"),rows=Array.from(tb.querySelectorAll("tr"));var ci=parseInt(th.getAttribute("data-col"));if(isNaN(ci))return;var asc=ss[ci]!==true;ss={{}};ss[ci]=asc;rows.sort(function(a,b){{var aT=(a.cells[ci]?a.cells[ci].textContent:'').trim(),bT=(b.cells[ci]?b.cells[ci].textContent:'').trim();var aN=parseFloat(aT.replace(/,/g,"")),bN=parseFloat(bT.replace(/,/g,""));if(aT===""&&bT==="")return 0;if(aT==="")return 1;if(bT==="")return -1;if(!isNaN(aN)&&!isNaN(bN))return asc?aN-bN:bN-aN;return asc?aT.localeCompare(bT,'ko'):bT.localeCompare(aT,'ko')}});rows.forEach(function(r){{tb.appendChild(r)}});var allR=tb.querySelectorAll("tr");allR.forEach(function(r,i){{if(r.cells[0])r.cells[0].textContent=i+1}});t.querySelectorAll("thead th").forEach(function(h){{var ar=h.querySelector(".sa");if(!ar)return;var hi=parseInt(h.getAttribute("data-col"));if(hi===ci){{ar.textContent=asc?"▲":"▼";ar.className="sa active"}}else{{ar.textContent="▲▼";ar.className="sa"}}}});setTimeout(autoR,50)}}
 window.addEventListener('load',function(){{_ld();applyF();autoR()}});
 window.addEventListener('resize',function(){{applyF();autoR()}});
+</script>"""
+
+    if lazy:
+        # 데이터 대신 table_frame 요청/응답으로 동작하도록 함수 교체
+        html += f"""
+<script>
+function _ld(){{ok=true}}
+var _cb=null;
+function copyC(i,btn,e){{e.stopPropagation();_cb=btn;stReq('clip',i)}}
+function showP(i,e){{if(e)e.stopPropagation();stReq('prize',i)}}
+function onRowPayload(p){{if(p.kind==='clip'){{var t=p.content,btn=_cb;if(!t){{alert('복사할 내용이 없습니다.');return}}if(isMob()&&navigator.share){{navigator.share({{text:t}}).then(function(){{_fb(btn)}}).catch(function(){{_so(t)}});return}}_so(t)}}else if(p.kind==='prize'){{if(!p.content){{alert('시상금 데이터가 없습니다.');return}}document.getElementById('pc').innerHTML=p.content;document.getElementById('po').style.display='flex'}}}}
+function autoR(){{var vh=900;try{{vh=window.parent.innerHeight||900}}catch(e){{}}var h=0;if(isMob()){{var mv=document.querySelector('.mv');if(mv)h=Math.min(mv.scrollHeight+20,Math.round(vh*.80))}}else{{var w=document.getElementById("wrap_{table_id}");if(w)h=Math.min(w.scrollHeight+4,Math.round(vh*.85))}}if(h)stHeight(h)}}
+</script>"""
+
+    if virtual:
+        # 보이는 구간만 그리는 가상 스크롤 (정렬은 순서 배열, 틀고정은 헤더 폭 기준)
+        html += f"""
+<style>
+.pt tbody tr.vz td{{height:0;line-height:0;padding-top:0;padding-bottom:0;border-top:0;border-bottom:0;visibility:hidden}}
+.pt tbody tr.vs td{{padding:0;border:0;background:transparent}}
+.pt tbody tr.vr td{{background:#fff}}.pt tbody tr.vr.ve td{{background:#f7f8fa}}.pt tbody tr.vr:hover td{{background:#eef1f6}}
+.vm .mh{{flex-wrap:nowrap;overflow:hidden;height:52px}}.vm .ms{{overflow:hidden}}.vm .mname{{white-space:nowrap}}.vm .mb{{transition:none}}
+</style>
+<script>
+var VD=JSON.parse(_d(document.getElementById('__vd').textContent.trim())),VN=VD.c.length?VD.c[0].length:0,NC=VD.h.length;
+var VO=[],VS=false,VRH=0,VP=0,VOI=-1,VOH=0,VX=20;
+for(var i=0;i<VN;i++)VO.push(i);
+function _fcl(c){{if(c>=FC)return"";return c===FC-1?"cf cfl":"cf"}}
+function _sp(h,td){{return h>0?(td?'<tr class="vs"><td colspan="'+(NC+1)+'" style="height:'+h+'px"></td></tr>':'<div style="height:'+h+'px"></div>'):''}}
+function _tr(r,p){{var h='<tr class="vr'+(p%2?' ve':'')+'">';for(var c=0;c<NC;c++){{var v=(c===0&&VS)?String(p+1):VD.c[c][r];h+='<td class="'+_fcl(c)+(VD.sc[c]&&v?' sc':'')+'" data-col="'+c+'">'+v+'</td>'}}h+='<td data-col="-1"><button class="dcopy" onclick="copyC('+r+',this,event)">📋</button>';if(VD.m[r]!==undefined)h+='<button class="dcopy" onclick="showP('+r+',event)" style="margin-left:2px">💰</button>';return h+'</td></tr>'}}
+function vrT(){{var w=document.getElementById("wrap_{table_id}"),t=document.getElementById("{table_id}");if(!w||!t||isMob())return;var tb=t.tBodies[0],rh=VRH||32,hh=t.tHead.offsetHeight,s=Math.max(0,Math.floor((w.scrollTop-hh)/rh)-VX),e=Math.min(VN,s+Math.ceil(w.clientHeight/rh)+2*VX);var h=tb.rows[0].outerHTML+_sp(s*rh,1);for(var p=s;p<e;p++)h+=_tr(VO[p],p);tb.innerHTML=h+_sp((VN-e)*rh,1);if(!VRH){{var fr=tb.querySelector('tr.vr');if(fr&&fr.offsetHeight){{VRH=fr.offsetHeight;vrT();return}}}}applyF()}}
+function _card(r){{var o=r===VOI,num=VD.ni>=0?VD.c[VD.ni][r]:String(r+1),nm=VD.nm>=0?VD.c[VD.nm][r]:'',b=[];
+if(VD.ti>=0){{var t=VD.c[VD.ti][r].trim();if(t&&t!=='0')b.push('<span style="background:#fff3e0;color:#d9232e;padding:2px 6px;border-radius:4px;font-size:11px;font-weight:700">💰'+t+'</span>')}}
+for(var c=0;c<NC;c++)if(VD.h[c].indexOf('부족')>=0){{var v=VD.c[c][r].trim();if(v&&v!=='0')b.push('<span style="background:#FFF5F5;color:rgb(128,0,0);padding:2px 8px;border-radius:10px;font-size:12px;font-weight:700">🔴 '+VD.h[c]+': '+v+'</span>')}}
+var h='<div class="mc'+(o?' open':'')+'"><div class="mh" onclick="vTg('+r+')"><span class="mn">'+num+'</span><span class="mname">'+nm+'</span>'+(b.length?'<span class="ms">'+b.join(' ')+'</span>':'')+'<span class="chev">&#9660;</span></div><div class="mb">';
+if(o){{h+='<div style="padding:10px 14px 6px;text-align:center"><button class="mcopy" onclick="copyC('+r+',this,event)">📋 카톡 보내기</button>';if(VD.m[r]!==undefined)h+='<button class="mcopy" onclick="showP('+r+',event)" style="background:#fff3e0;color:#d9232e;border:1px solid #ffd4a8;margin-top:4px">💰 시상금 상세</button>';h+='</div>';
+var ag=VD.ai>=0?VD.c[VD.ai][r]:'';if(ag&&ag!=='0')h+='<div class="mr"><span class="ml">지사</span><span class="mval">'+ag+'</span></div>';
+var cg=null;for(var c=0;c<NC;c++){{var n=VD.h[c];if(n==='순번'||n==='지사'||n==='설계사명')continue;var v=VD.c[c][r].trim();if(!v||v==='0')continue;var g=VD.g[c];if(g&&g!==cg){{h+='<div class="mgl" style="border-left:3px solid '+(VD.gc[g]||'#4e5968')+';padding-left:8px">'+g+'</div>';cg=g}}else if(g===null&&cg!==null)cg=null;h+='<div class="mr'+(VD.sc[c]?' msc':'')+'"><span class="ml">'+n+'</span><span class="mval">'+v+'</span></div>'}}
+if(VD.m[r]!==undefined)h+=VD.m[r]}}
+return h+'</div></div>'}}
+function _off(i){{return i*VP+(VOI>=0&&i>VOI?VOH-VP:0)}}
+function _at(y){{if(VOI<0||y<VOI*VP)return Math.floor(y/VP);if(y<VOI*VP+VOH)return VOI;return VOI+1+Math.floor((y-VOI*VP-VOH)/VP)}}
+function vrM(){{var mv=document.getElementById("mv_{table_id}");if(!mv||!isMob()||!VN)return;if(!VP){{mv.innerHTML=_card(VOI===0?1:0);var fc=mv.querySelector('.mc');VP=fc?fc.offsetHeight+10:64}}if(VOI>=0&&!VOH)VOH=VP;var s=Math.max(0,_at(mv.scrollTop)-VX),e=Math.min(VN,_at(mv.scrollTop+mv.clientHeight)+1+VX),h=_sp(_off(s));for(var i=s;i<e;i++)h+=_card(i);mv.innerHTML=h+_sp(_off(VN)-_off(e));if(VOI>=s&&VOI<e){{var oc=mv.querySelector('.mc.open');if(oc&&oc.offsetHeight+10!==VOH){{VOH=oc.offsetHeight+10;vrM()}}}}}}
+function vTg(r){{VOI=VOI===r?-1:r;VOH=0;vrM();setTimeout(autoR,50)}}
+function applyF(){{var t=document.getElementById("{table_id}");var fc=isMob()?Math.min(FC,2):FC;if(!t||fc===0)return;var hr=t.querySelector("thead tr.rc");if(!hr)return;var lp=[],cl=0;for(var i=0;i<fc;i++){{lp.push(cl);if(hr.cells[i])cl+=hr.cells[i].offsetWidth}}t.querySelectorAll(".cf").forEach(function(c){{var idx=parseInt(c.getAttribute("data-col"));if(!isNaN(idx)&&idx<fc){{c.style.left=lp[idx]+"px";c.style.position="sticky";c.style.zIndex=c.tagName==="TH"?"3":"1"}}else if(!isNaN(idx)&&idx>=fc){{c.style.position="static";c.style.boxShadow="none"}}}})}}
+function sortT(th){{var ci=parseInt(th.getAttribute("data-col"));if(isNaN(ci))return;var asc=ss[ci]!==true;ss={{}};ss[ci]=asc;var pos={{}};VO.forEach(function(r,p){{pos[r]=p}});var vs=VS;function k(r){{return((ci===0&&vs)?String(pos[r]+1):VD.c[ci][r]).trim()}}VO.sort(function(a,b){{var aT=k(a),bT=k(b);var aN=parseFloat(aT.replace(/,/g,"")),bN=parseFloat(bT.replace(/,/g,""));if(aT===""&&bT==="")return 0;if(aT==="")return 1;if(bT==="")return -1;if(!isNaN(aN)&&!isNaN(bN))return asc?aN-bN:bN-aN;return asc?aT.localeCompare(bT,'ko'):bT.localeCompare(aT,'ko')}});VS=true;document.getElementById("{table_id}").querySelectorAll("thead th").forEach(function(h){{var ar=h.querySelector(".sa");if(!ar)return;var hi=parseInt(h.getAttribute("data-col"));if(hi===ci){{ar.textContent=asc?"▲":"▼";ar.className="sa active"}}else{{ar.textContent="▲▼";ar.className="sa"}}}});vrT();setTimeout(autoR,50)}}
+function _vq(f){{var q=false;return function(){{if(q)return;q=true;requestAnimationFrame(function(){{q=false;f()}})}}}}
+(function(){{var w=document.getElementById("wrap_{table_id}"),mv=document.getElementById("mv_{table_id}");if(w)w.addEventListener('scroll',_vq(vrT));if(mv)mv.addEventListener('scroll',_vq(vrM))}})();
+window.addEventListener('load',function(){{vrT();vrM();autoR()}});
+window.addEventListener('resize',function(){{VRH=0;VP=0;VOH=0;vrT();vrM()}});
 </script>"""
     return html
 
 
+_table_frame = components.declare_component("table_frame", path=TABLE_FRAME_DIR)
+
+
+def render_lazy_table(df, col_groups, prize_data_map, data_date, footer, key="lazy_table", virtual=False):
+    """행 식별자만 보내는 테이블 — 복사/시상 버튼을 누른 행만 서버에서 만들어 응답"""
+    html = render_html_table(df, col_groups, prize_data_map, data_date, footer, lazy=True, virtual=virtual)
+
+    payload = None
+    req = st.session_state.get(key)
+    if isinstance(req, dict) and req.get('n') != st.session_state.get(f"{key}_n"):
+        st.session_state[f"{key}_n"] = req.get('n')
+        row = req.get('row')
+        if isinstance(row, int) and 0 <= row < len(df):
+            if req.get('kind') == 'clip':
+                content = row_clip_text(df, row, prize_data_map, data_date, footer)
+            else:
+                content = row_prize_html(prize_data_map, row)
+            payload = {'kind': req.get('kind'), 'row': row, 'n': req.get('n'), 'content': content}
+
+    _table_frame(html=html, payload=payload, key=key, default=None)
+
+
 # ═══════════════════════════════════════════════════════
 # 8. 메인 앱
 # ═══════════════════════════════════════════════════════
@@ -1003,13 +1259,15 @@ def main():
         """)
         st.stop()
 
-    df_merged = load_and_merge(sum_path, bridge_path)
+    data_ver = data_version(sum_path, bridge_path)
+    df_merged = load_and_merge(sum_path, bridge_path, data_ver)
     prize_struct = detect_prize_structure(df_merged, settings)
+    num_view = build_numeric_view(df_merged, prize_struct, data_ver)
 
     if menu == "관리자 화면 (상태)":
         show_admin(df_merged, prize_struct, sum_path, bridge_path, data_date, settings)
     else:
-        show_manager(df_merged, prize_struct, data_date, settings)
+        show_manager(df_merged, prize_struct, data_date, settings, num_view, data_ver)
 
 
 def show_admin(df, ps, sum_path, bridge_path, data_date, settings):
@@ -1080,13 +1338,15 @@ def show_admin(df, ps, sum_path, bridge_path, data_date, settings):
         "상품": "상품 추가",
         "상품추가": "상품 추가2",
         "유퍼간편": "유퍼스트"
-      }
+      },
+      "lazy_table": false,
+      "virtual_table_rows": 300
     }
     ```
     """)
 
 
-def show_manager(df, ps, data_date, settings):
+def show_manager(df, ps, data_date, settings, num_view=None, data_ver=None):
     """매니저 화면 — 로그인 후 산하 설계사 실적 표시"""
     manager_col = '지원매니저코드'
     manager_name_col = '지원매니저명'
@@ -1100,19 +1360,28 @@ def show_manager(df, ps, data_date, settings):
         manager_code = st.text_input("🔑 매니저 코드를 입력하세요", type="password")
         submit = st.form_submit_button("로그인 및 조회")
 
-    if not (submit and manager_code):
+    # 지연 생성 모드에서만 로그인 코드 유지 (테이블 컴포넌트 요청으로 재실행돼도 화면 유지)
+    lazy = settings.get('lazy_table', DEFAULT_SETTINGS['lazy_table'])
+    if submit and manager_code and lazy:
+        st.session_state['mgr_login_code'] = manager_code
+    elif submit or not lazy:
+        st.session_state.pop('mgr_login_code', None)
+    if not submit:
+        manager_code = st.session_state.get('mgr_login_code', '')
+
+    if not manager_code:
         st.title("👤 매니저 전용 실적 현황")
         st.info("매니저 코드를 입력하고 [로그인 및 조회]를 눌러주세요.")
         return
 
-    code_clean = clean_key(manager_code)
-    df['_mgr_key'] = df[manager_col].apply(clean_key)
-    my_df = df[df['_mgr_key'] == code_clean].copy()
+    if 'mgr_login_code' in st.session_state and st.button("🔒 로그아웃", key="mgr_logout"):
+        st.session_state.pop('mgr_login_code', None)
+        st.rerun()
 
-    if my_df.empty:
-        # 부분 매칭 시도
-        mask = df['_mgr_key'].str.contains(code_clean, na=False)
-        my_df = df[mask].copy()
+    code_clean = clean_key(manager_code)
+    # 정확히 일치 → 없으면 부분 매칭 (인덱스는 데이터 버전당 한 번 생성)
+    mgr_index = build_manager_index(df, manager_col, data_ver)
+    my_df = df.iloc[find_manager_rows(mgr_index, code_clean)].copy()
 
     if my_df.empty:
         st.error(f"❌ 매니저 코드 '{manager_code}'에 일치하는 데이터가 없습니다.")
@@ -1133,7 +1402,9 @@ def show_manager(df, ps, data_date, settings):
         my_df = my_df.sort_values(by=sort_cols)
 
     # 표시 데이터 빌드
-    display_df, col_groups, prize_data_map = build_display(my_df, ps, settings)
+    rows = df.index.get_indexer(my_df.index)
+    my_nums = {c: a[rows] for c, a in (num_view or {}).items()}
+    display_df, col_groups, prize_data_map = build_display(my_df, ps, settings, my_nums)
 
     # 헤더
     date_html = f"<span style='font-size:14px;color:rgba(255,255,255,0.85);float:right;margin-top:8px'>📅 {data_date}</span>" if data_date else ""
@@ -1147,8 +1418,13 @@ def show_manager(df, ps, data_date, settings):
 
     # HTML 테이블 렌더
     footer = settings.get('clip_footer', DEFAULT_SETTINGS['clip_footer'])
-    table_html = render_html_table(display_df, col_groups, prize_data_map, data_date, footer)
-    components.html(table_html, height=800, scrolling=False)
+    v_rows = settings.get('virtual_table_rows', DEFAULT_SETTINGS['virtual_table_rows'])
+    virtual = bool(v_rows) and len(display_df) >= v_rows
+    if lazy:
+        render_lazy_table(display_df, col_groups, prize_data_map, data_date, footer, virtual=virtual)
+    else:
+        table_html = render_html_table(display_df, col_groups, prize_data_map, data_date, footer, virtual=virtual)
+        components.html(table_html, height=800, scrolling=False)
 
 
 if __name__ == "__main__":
@@ -3,14 +3,24 @@ import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
 import re
+import ast
+import operator
 import io
 import os
 import pickle
 import uuid
 import shutil
 import json
+import hashlib
+import threading
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow 없으면 기존 pkl 저장 방식 사용
+    pa = None
+
 st.set_page_config(page_title="지원매니저별 실적 관리 시스템", layout="wide")
 
 # 📱 모바일 뷰포트 메타 태그 삽입
@@ -18,8 +28,12 @@ st.markdown("""
 <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
 """, unsafe_allow_html=True)
 
-DATA_FILE = "app_data.pkl"
-CONFIG_FILE = "app_config.pkl"
+DATA_FILE = "app_data.pkl"      # 구 형식 (pyarrow 없을 때 / 마이그레이션용)
+CONFIG_FILE = "app_config.pkl"  # 구 형식 (마이그레이션용)
+CONFIG_JSON = "app_config.json"
+STORE_DIR = "app_store"         # data_<시각>.arrow 버전 파일 + CURRENT(현재 버전 파일명)
+INGEST_DIR = os.path.join(STORE_DIR, "ingest")  # 업로드 파일 파싱 결과 (<내용 해시>.arrow)
+TABLE_FRAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "table_frame")
 
 # ==========================================
 # 0. 메리츠 스타일 커스텀 CSS (디자인 전면 개편)
@@ -204,9 +218,109 @@ iframe {
 # ==========================================
 # 1. 설정 및 데이터 영구 저장/불러오기 함수
 # ==========================================
-def load_data_and_config():
+def _arrow_table(df):
+    """DataFrame → Arrow Table. 타입이 섞인 object 열(숫자+문자 등)은 문자열로 바꿔 재시도"""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for c in df.columns:
+            if df[c].dtype != object: continue
+            try:
+                pa.array(df[c], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+        return pa.Table.from_pandas(df, preserve_index=True)
+
+def _store_current():
+    """CURRENT 포인터가 가리키는 데이터 파일 경로 (없으면 None)"""
+    try:
+        with open(os.path.join(STORE_DIR, "CURRENT"), 'r', encoding='utf-8') as f:
+            name = f.read().strip()
+        path = os.path.join(STORE_DIR, name)
+        return path if name and os.path.exists(path) else None
+    except Exception:
+        return None
+
+def _write_store(df, ver=None):
+    """새 버전 파일 기록 후 CURRENT 포인터를 원자적으로 교체 (ver: 파일명에 쓸 데이터 버전)"""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    name = f"data_{ver or datetime.now().strftime('%Y%m%d%H%M%S%f')}.arrow"
+    path = os.path.join(STORE_DIR, name)
+    table = _arrow_table(df)
+    # 한 덩어리로 기록해야 읽을 때 결측 없는 숫자 열이 복사 없이 매핑됨
+    feather.write_feather(table, path + ".tmp", compression='uncompressed', chunksize=max(table.num_rows, 1))
+    os.replace(path + ".tmp", path)
+    ptr = os.path.join(STORE_DIR, "CURRENT")
+    with open(ptr + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(ptr + ".tmp", ptr)
+    # 이전 버전 정리 (직전 버전 1개는 아직 읽는 세션을 위해 남김)
+    olds = sorted(f for f in os.listdir(STORE_DIR) if f.startswith('data_') and f.endswith('.arrow') and f != name)
+    for f in olds[:-1]:
+        try: os.remove(os.path.join(STORE_DIR, f))
+        except Exception: pass
+
+def _load_store_frame(path):
+    """버전 파일 읽기 — 결측 없는 숫자 열은 파일 매핑을 그대로 쓰고(복사 없음), 문자·결측 열만 힙으로 복사
+    보관은 _dataset_registry 한 곳에서만 (프로세스당 한 벌)"""
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+def _freeze_frame(df):
+    """공용 프레임의 숫자 열 배열을 쓰기 금지로 표시 — 제자리 수정 시 ValueError"""
+    for i in range(df.shape[1]):
+        arr = df.iloc[:, i].to_numpy()
+        if arr.dtype.kind not in 'biufcmM': continue
+        while isinstance(arr.base, np.ndarray):
+            arr = arr.base
+        arr.setflags(write=False)
+    return df
+
+def _write_config(cfg):
+    """설정 JSON 저장 (.bak 백업 + 임시 파일 교체)"""
+    if os.path.exists(CONFIG_JSON):
+        shutil.copy2(CONFIG_JSON, CONFIG_JSON + ".bak")
+    tmp = CONFIG_JSON + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cfg, f, ensure_ascii=False, indent=2, default=str)
+    shutil.move(tmp, CONFIG_JSON)
+
+def _read_config():
+    """설정 로드 — JSON(→.bak) 우선, 없으면 구 pkl(→.bak)을 읽어 JSON으로 이전"""
+    for fp in [CONFIG_JSON, CONFIG_JSON + ".bak"]:
+        if not os.path.exists(fp): continue
+        try:
+            with open(fp, 'r', encoding='utf-8') as f:
+                d = json.load(f)
+            if isinstance(d, dict):
+                return d
+        except Exception:
+            continue
+    for fp in [CONFIG_FILE, CONFIG_FILE + ".bak"]:
+        if not os.path.exists(fp): continue
+        try:
+            with open(fp, 'rb') as f:
+                d = pickle.load(f)
+            if isinstance(d, dict):
+                d.pop('df_merged', None)
+                try: _write_config(d)
+                except Exception: pass
+                return d
+        except Exception:
+            continue
+    return {}
+
+@st.cache_resource(show_spinner=False)
+def _dataset_registry():
+    """프로세스 공용 데이터셋 레지스트리 — 모든 세션이 같은 프레임을 복사 없이 읽음
+    df: 병합 데이터 (수정 금지), version: 병합 시각 (데이터가 없으면 None)"""
+    return {'df': None, 'version': None, 'lock': threading.Lock()}
+
+def _load_dataset():
+    """저장된 병합 데이터 로드 → (버전, DataFrame)
+    컬럼 저장소(CURRENT) 우선, 없으면 구 pkl을 읽어 저장소로 이전"""
     # 구 형식(통합 pkl) 자동 마이그레이션
-    if not os.path.exists(DATA_FILE) and os.path.exists(CONFIG_FILE):
+    if not os.path.exists(DATA_FILE) and _store_current() is None and os.path.exists(CONFIG_FILE):
         try:
             with open(CONFIG_FILE, 'rb') as f:
                 old = pickle.load(f)
@@ -219,20 +333,58 @@ def load_data_and_config():
         except Exception:
             pass
     
-    # 1) 설정 로드
-    cfg = None
-    for fp in [CONFIG_FILE, CONFIG_FILE + ".bak"]:
-        if not os.path.exists(fp): continue
+    path = _store_current() if pa is not None else None
+    if path:
         try:
-            with open(fp, 'rb') as f:
-                d = pickle.load(f)
-            if isinstance(d, dict):
-                cfg = d
-                break
+            return os.path.basename(path)[len('data_'):-len('.arrow')], _load_store_frame(path)
         except Exception:
-            continue
-    if cfg is None:
-        cfg = {}
+            pass
+    if os.path.exists(DATA_FILE):
+        try:
+            with open(DATA_FILE, 'rb') as f:
+                data = pickle.load(f)
+            df = data.get('df_merged', pd.DataFrame()) if isinstance(data, dict) else pd.DataFrame()
+            if isinstance(df, pd.DataFrame) and not df.empty:
+                ver = datetime.fromtimestamp(os.path.getmtime(DATA_FILE)).strftime('%Y%m%d%H%M%S%f')
+                if pa is not None:
+                    try: _write_store(df, ver)
+                    except Exception: pass
+                return ver, df
+        except Exception:
+            pass
+    return None, pd.DataFrame()
+
+def get_dataset():
+    """현재 공용 병합 데이터 (읽기 전용 — 가공이 필요하면 필터 후 복사)"""
+    reg = _dataset_registry()
+    if reg['df'] is None:
+        with reg['lock']:
+            if reg['df'] is None:
+                ver, df = _load_dataset()
+                reg['version'], reg['df'] = ver, _freeze_frame(df)
+    return reg['df']
+
+def dataset_version():
+    get_dataset()
+    return _dataset_registry()['version']
+
+def publish_dataset(df):
+    """새 병합 결과를 공용 데이터로 교체 (다른 세션은 다음 실행부터 새 버전을 읽음)"""
+    reg = _dataset_registry()
+    with reg['lock']:
+        reg['version'] = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        reg['df'] = _freeze_frame(df)
+    st.session_state['data_ver'] = reg['version']
+    return reg['version']
+
+def clear_dataset():
+    reg = _dataset_registry()
+    with reg['lock']:
+        reg['version'], reg['df'] = None, pd.DataFrame()
+
+def load_data_and_config():
+    # 1) 설정 로드
+    cfg = _read_config()
     
     st.session_state['manager_col'] = str(cfg.get('manager_col', ""))
     st.session_state['manager_name_col'] = str(cfg.get('manager_name_col', ""))
@@ -251,22 +403,18 @@ def load_data_and_config():
     st.session_state['col_groups'] = cfg.get('col_groups', []) if isinstance(cfg.get('col_groups'), list) else []
     st.session_state['data_date'] = str(cfg.get('data_date', ''))
     st.session_state['clip_footer'] = str(cfg.get('clip_footer', ''))
+    st.session_state['lazy_table'] = bool(cfg.get('lazy_table', False))
+    st.session_state['virtual_table_rows'] = int(cfg.get('virtual_table_rows', 300) or 0)
+    st.session_state['merge_chunk_rows'] = int(cfg.get('merge_chunk_rows', 200000) or 0)
     st.session_state['prize_config'] = cfg.get('prize_config', []) if isinstance(cfg.get('prize_config'), list) else []
     for item in st.session_state['admin_cols']:
         if 'fallback_col' not in item: item['fallback_col'] = ''
     
-    # 2) DataFrame 로드 (DATA_FILE에서만)
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'rb') as f:
-                data = pickle.load(f)
-            df = data.get('df_merged', pd.DataFrame()) if isinstance(data, dict) else pd.DataFrame()
-            st.session_state['df_merged'] = df if isinstance(df, pd.DataFrame) else pd.DataFrame()
-        except Exception:
-            st.session_state['df_merged'] = pd.DataFrame()
+    # 설정을 읽은 데이터 버전 (다른 세션에서 데이터가 교체되면 설정도 다시 읽음)
+    st.session_state['data_ver'] = dataset_version()
 
 def _reset_session_state():
-    st.session_state['df_merged'] = pd.DataFrame()
+    st.session_state['data_ver'] = None
     st.session_state['manager_col'] = ""
     st.session_state['manager_name_col'] = ""
     st.session_state['manager_col2'] = ""
@@ -279,11 +427,13 @@ def _reset_session_state():
     st.session_state['col_groups'] = []
     st.session_state['data_date'] = ''
     st.session_state['clip_footer'] = ''
+    st.session_state['lazy_table'] = False
+    st.session_state['virtual_table_rows'] = 300
+    st.session_state['merge_chunk_rows'] = 200000
     st.session_state['prize_config'] = []
 
 def has_data():
-    df = st.session_state.get('df_merged', None)
-    return isinstance(df, pd.DataFrame) and not df.empty
+    return not get_dataset().empty
 
 def save_config():
     """설정만 저장 (가벼움 — 버튼 클릭 시마다 호출해도 부담 없음)"""
@@ -300,22 +450,29 @@ def save_config():
         'col_groups': st.session_state.get('col_groups', []),
         'data_date': st.session_state.get('data_date', ''),
         'clip_footer': st.session_state.get('clip_footer', ''),
+        'lazy_table': st.session_state.get('lazy_table', False),
+        'virtual_table_rows': st.session_state.get('virtual_table_rows', 300),
+        'merge_chunk_rows': st.session_state.get('merge_chunk_rows', 200000),
         'prize_config': st.session_state.get('prize_config', []),
     }
     try:
-        if os.path.exists(CONFIG_FILE):
-            shutil.copy2(CONFIG_FILE, CONFIG_FILE + ".bak")
-        tmp = CONFIG_FILE + ".tmp"
-        with open(tmp, 'wb') as f:
-            pickle.dump(cfg, f)
-        shutil.move(tmp, CONFIG_FILE)
+        _write_config(cfg)
     except Exception:
         pass
 
 def save_data():
-    """DataFrame만 저장 (무거움 — 파일 병합 시에만 호출)"""
+    """DataFrame만 저장 (무거움 — 파일 병합 시에만 호출)
+    pyarrow가 있으면 컬럼 저장소(STORE_DIR), 실패하거나 없으면 pkl"""
+    if pa is not None:
+        try:
+            _write_store(get_dataset(), dataset_version())
+            return
+        except Exception:
+            # 저장소 기록 실패 → pkl로 저장하고 CURRENT를 치워 pkl이 읽히게 함
+            try: os.remove(os.path.join(STORE_DIR, "CURRENT"))
+            except Exception: pass
     try:
-        data = {'df_merged': st.session_state.get('df_merged', pd.DataFrame())}
+        data = {'df_merged': get_dataset()}
         tmp = DATA_FILE + ".tmp"
         with open(tmp, 'wb') as f:
             pickle.dump(data, f)
@@ -337,86 +494,118 @@ def _safe_float_prize(val):
     try: return float(s)
     except: return 0.0
 
-def calculate_prize_for_code(target_code, prize_config, df_src):
-    """특정 사번의 시상금을 df_merged에서 계산"""
-    if not prize_config or df_src is None or df_src.empty:
-        return [], 0
-    results = []
-    safe_code = clean_key(str(target_code))
-    
-    for cfg in prize_config:
+def _prize_values(df, col):
+    """시상 계산용 숫자 배열 (_safe_float_prize와 같은 규칙 — 빈값/변환 불가는 0)"""
+    if not col or col not in df.columns:
+        return np.zeros(len(df))
+    s = df[col]
+    if not pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        s = pd.to_numeric(s.astype(str).str.replace(',', '', regex=False).str.strip(), errors='coerce')
+    return s.astype(float).fillna(0.0).to_numpy()
+
+def _tier_search(tiers, vals):
+    """설정 순서 그대로의 구간 목록에서
+    hit: vals 이상인 첫 구간 인덱스 (없으면 len), nxt: vals 미만인 마지막 구간 인덱스 (없으면 -1)
+    누적 최소/최대를 취하면 정렬되지 않은 목록도 searchsorted 한 번으로 찾을 수 있음"""
+    amts = np.array([float(t[0]) for t in tiers], dtype=float)
+    hit = np.searchsorted(-np.minimum.accumulate(amts), -vals, side='left')
+    nxt = np.searchsorted(-np.maximum.accumulate(amts[::-1])[::-1], -vals, side='left') - 1
+    return hit, nxt
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def compile_prize_table(_df_src, config_json, data_ver=None):
+    """prize_config 전체를 전 설계사 대상 배열 연산으로 한 번에 계산 (설정 버전 × 데이터 버전별 캐시)
+    반환: 설정 항목별 {'cfg', 'kind', 'pos': {사번: 행}, 배열들} 리스트 — prize_for_code로 조회"""
+    table = []
+    if _df_src is None or _df_src.empty:
+        return table
+    key_cache = {}
+    for cfg in json.loads(config_json):
         col_code = cfg.get('col_code', '')
-        if not col_code or col_code not in df_src.columns:
-            continue
-        
-        _cc = f"_pclean_{col_code}"
-        if _cc not in df_src.columns:
-            df_src[_cc] = df_src[col_code].apply(clean_key)
-        match_df = df_src[df_src[_cc] == safe_code]
-        if match_df.empty:
+        if not col_code or col_code not in _df_src.columns:
             continue
+        if col_code not in key_cache:
+            keys = _df_src[col_code].map(clean_key)
+            first = ~keys.duplicated().to_numpy()
+            # 사번별 첫 행만 사용 (기존 match_df.values[0]과 동일)
+            key_cache[col_code] = (np.flatnonzero(first), {k: n for n, k in enumerate(keys[first])})
+        rows, pos = key_cache[col_code]
+        sub = _df_src.iloc[rows]
         
         cat = cfg.get('category', 'weekly')
         p_type = cfg.get('type', '구간 시책')
-        
+        tiers = cfg.get('tiers', [])
+        amts = np.array([float(t[0]) for t in tiers] + [0.0])
+        rates = np.array([float(t[1]) for t in tiers] + [0.0])
+        ent = {'cfg': cfg, 'pos': pos, 'tiers': tiers}
         if cat == 'weekly':
             if "1기간" in p_type:
-                raw_prev = match_df[cfg['col_val_prev']].values[0] if cfg.get('col_val_prev') and cfg['col_val_prev'] in df_src.columns else 0
-                raw_curr = match_df[cfg['col_val_curr']].values[0] if cfg.get('col_val_curr') and cfg['col_val_curr'] in df_src.columns else 0
-                val_prev, val_curr = _safe_float_prize(raw_prev), _safe_float_prize(raw_curr)
+                val_prev = _prize_values(sub, cfg.get('col_val_prev'))
+                val_curr = _prize_values(sub, cfg.get('col_val_curr'))
                 curr_req = float(cfg.get('curr_req', 100000.0))
-                calc_rate, tier_prev, prize = 0, 0, 0
-                if val_curr >= curr_req:
-                    for amt, rate in cfg.get('tiers', []):
-                        if val_prev >= amt:
-                            tier_prev, calc_rate = amt, rate
-                            prize = (tier_prev + curr_req) * (calc_rate / 100)
-                            break
-                shortfall_curr = max(0, curr_req - val_curr)
-                results.append({"name": cfg['name'], "category": "weekly", "type": "브릿지1",
-                    "val_prev": val_prev, "val_curr": val_curr, "curr_req": curr_req,
-                    "rate": calc_rate, "prize": prize, "shortfall_curr": shortfall_curr})
+                hit, _ = _tier_search(tiers, val_prev)
+                hit = np.where(val_curr >= curr_req, hit, len(tiers))
+                ent.update(kind='브릿지1', val_prev=val_prev, val_curr=val_curr, curr_req=curr_req, hit=hit,
+                    prize=(amts[hit] + curr_req) * (rates[hit] / 100),
+                    shortfall_curr=curr_req - val_curr)
             elif "2기간" in p_type:
-                raw_curr = match_df[cfg['col_val_curr']].values[0] if cfg.get('col_val_curr') and cfg['col_val_curr'] in df_src.columns else 0
-                val_curr = _safe_float_prize(raw_curr)
+                val = _prize_values(sub, cfg.get('col_val_curr'))
                 curr_req = float(cfg.get('curr_req', 100000.0))
-                calc_rate, tier_achieved, prize = 0, 0, 0
-                for amt, rate in cfg.get('tiers', []):
-                    if val_curr >= amt: tier_achieved, calc_rate = amt, rate; break
-                if tier_achieved > 0:
-                    prize = (tier_achieved + curr_req) * (calc_rate / 100)
-                next_tier = None
-                for amt, rate in reversed(cfg.get('tiers', [])):
-                    if val_curr < amt: next_tier = amt; break
-                shortfall = (next_tier - val_curr) if next_tier else 0
-                results.append({"name": cfg['name'], "category": "weekly", "type": "브릿지2",
-                    "val": val_curr, "tier": tier_achieved, "rate": calc_rate, "prize": prize,
-                    "curr_req": curr_req, "next_tier": next_tier, "shortfall": shortfall})
+                hit, nxt = _tier_search(tiers, val)
+                ent.update(kind='브릿지2', val=val, curr_req=curr_req, hit=hit, nxt=nxt,
+                    prize=(amts[hit] + curr_req) * (rates[hit] / 100),
+                    shortfall=amts[nxt] - val)
             else:
-                raw_val = match_df[cfg['col_val']].values[0] if cfg.get('col_val') and cfg['col_val'] in df_src.columns else 0
-                val = _safe_float_prize(raw_val)
-                calc_rate, tier_achieved, prize = 0, 0, 0
-                for amt, rate in cfg.get('tiers', []):
-                    if val >= amt:
-                        tier_achieved, calc_rate = amt, rate
-                        prize = tier_achieved * (calc_rate / 100)
-                        break
-                next_tier = None
-                for amt, rate in reversed(cfg.get('tiers', [])):
-                    if val < amt: next_tier = amt; break
-                shortfall = (next_tier - val) if next_tier else 0
-                results.append({"name": cfg['name'], "category": "weekly", "type": "구간",
-                    "val": val, "tier": tier_achieved, "rate": calc_rate, "prize": prize,
-                    "next_tier": next_tier, "shortfall": shortfall})
+                val = _prize_values(sub, cfg.get('col_val'))
+                hit, nxt = _tier_search(tiers, val)
+                ent.update(kind='구간', val=val, hit=hit, nxt=nxt,
+                    prize=amts[hit] * (rates[hit] / 100),
+                    shortfall=amts[nxt] - val)
         elif cat == 'cumulative':
-            col_val = cfg.get('col_val', '')
-            raw_val = match_df[col_val].values[0] if col_val and col_val in match_df.columns else 0
-            val = _safe_float_prize(raw_val)
-            col_prize = cfg.get('col_prize', '')
-            raw_prize = match_df[col_prize].values[0] if col_prize and col_prize in match_df.columns else 0
-            prize_val = _safe_float_prize(raw_prize)
+            ent.update(kind='누계', val=_prize_values(sub, cfg.get('col_val', '')),
+                prize=_prize_values(sub, cfg.get('col_prize', '')))
+        else:
+            continue
+        for k, v in ent.items():
+            if isinstance(v, np.ndarray): v.setflags(write=False)
+        table.append(ent)
+    return table
+
+def prize_for_code(prize_table, target_code):
+    """컴파일된 시상 테이블에서 특정 사번의 결과 조회 → (results, total)"""
+    results = []
+    safe_code = clean_key(str(target_code))
+    for ent in prize_table:
+        i = ent['pos'].get(safe_code)
+        if i is None:
+            continue
+        cfg, tiers, kind = ent['cfg'], ent['tiers'], ent['kind']
+        if kind == '누계':
             results.append({"name": cfg['name'], "category": "cumulative", "type": "누계",
-                "val": val, "prize": prize_val})
+                "val": float(ent['val'][i]), "prize": float(ent['prize'][i])})
+            continue
+        h = int(ent['hit'][i])
+        tier, rate = (tiers[h][0], tiers[h][1]) if h < len(tiers) else (0, 0)
+        if kind == '브릿지1':
+            sc = float(ent['shortfall_curr'][i])
+            results.append({"name": cfg['name'], "category": "weekly", "type": "브릿지1",
+                "val_prev": float(ent['val_prev'][i]), "val_curr": float(ent['val_curr'][i]), "curr_req": ent['curr_req'],
+                "rate": rate, "prize": float(ent['prize'][i]) if h < len(tiers) else 0,
+                "shortfall_curr": sc if sc > 0 else 0})
+            continue
+        n = int(ent['nxt'][i])
+        next_tier = tiers[n][0] if n >= 0 else None
+        shortfall = float(ent['shortfall'][i]) if next_tier else 0
+        if kind == '브릿지2':
+            results.append({"name": cfg['name'], "category": "weekly", "type": "브릿지2",
+                "val": float(ent['val'][i]), "tier": tier, "rate": rate,
+                "prize": float(ent['prize'][i]) if tier > 0 else 0,
+                "curr_req": ent['curr_req'], "next_tier": next_tier, "shortfall": shortfall})
+        else:
+            results.append({"name": cfg['name'], "category": "weekly", "type": "구간",
+                "val": float(ent['val'][i]), "tier": tier, "rate": rate,
+                "prize": float(ent['prize'][i]) if h < len(tiers) else 0,
+                "next_tier": next_tier, "shortfall": shortfall})
     
     # 총 시상 = 누계 + 브릿지만 (구간 시책은 누계에 이미 포함되므로 제외)
     cumul_sum = sum(r['prize'] for r in results if r['category'] == 'cumulative')
@@ -495,21 +684,80 @@ def build_prize_card_html(results, total):
     return h
 
 
-if 'df_merged' not in st.session_state:
+if 'manager_col' not in st.session_state:
     _reset_session_state()
     load_data_and_config()
+elif st.session_state.get('data_ver') != dataset_version():
+    load_data_and_config()
 
 # ==========================================
 # 2. 데이터 정제 및 스마트 조건 평가 함수
 # ==========================================
+_EXCEL_ESC = re.compile(r'_x([0-9a-fA-F]{4})_')
+
+def _decode_match(match):
+    try: return chr(int(match.group(1), 16))
+    except: return match.group(0)
+
 def decode_excel_text(val):
     if pd.isna(val): return val
     val_str = str(val)
     if '_x' not in val_str: return val_str
-    def decode_match(match):
-        try: return chr(int(match.group(1), 16))
-        except: return match.group(0)
-    return re.sub(r'_x([0-9a-fA-F]{4})_', decode_match, val_str)
+    return _EXCEL_ESC.sub(_decode_match, val_str)
+
+def decode_excel_frame(df):
+    """object 열 일괄 디코딩 — decode_excel_text를 셀마다 적용한 것과 같은 결과.
+    _x가 들어 있는 열만 str.replace로 처리한다."""
+    for col in df.columns:
+        s = df[col]
+        if s.dtype != object: continue
+        na = s.isna()
+        txt = s.astype(str)
+        if txt.str.contains('_x', regex=False, na=False).any():
+            txt = txt.str.replace(_EXCEL_ESC, _decode_match, regex=True)
+        df[col] = txt.where(~na, s)
+    return df
+
+def _format_number_text(val_str):
+    """콤마 포맷 + 0 숨김 (문자열 1개). 숫자가 아니면 None → 원래 값 유지"""
+    try:
+        if val_str.strip() == "": return ""
+        num = float(val_str.replace(',', ''))
+        if num == 0: return ""
+        if num.is_integer(): return f"{int(num):,}"
+        return f"{num:,.1f}"
+    except:
+        if val_str.strip() == "0" or val_str.strip() == "0.0": return ""
+        return None
+
+def format_with_comma_and_hide_zero(s):
+    """세 자리 콤마 + 0값 빈칸 — 열 단위 처리 (셀마다 적용한 것과 같은 결과).
+    숫자 열은 NumPy 마스크로, 그 외 열은 고유 문자열만 변환하고 숫자가 아닌 값은 그대로 둔다."""
+    if s.empty: return s
+    if s.dtype.kind in 'iu' or s.dtype == np.float64 or str(s.dtype) == 'Float64':
+        v = s.to_numpy(dtype='float64', na_value=np.nan)
+        out = np.full(len(v), "", dtype=object)
+        show = ~np.isnan(v) & (v != 0)
+        u, inv = np.unique(v[show], return_inverse=True)
+        fin = np.isfinite(u)
+        whole = fin & (u == np.floor(np.where(fin, u, 0)))
+        frac = fin & ~whole
+        fmt = np.empty(len(u), dtype=object)
+        fmt[whole] = [f"{int(x):,}" for x in u[whole]]
+        fmt[frac] = [f"{x:,.1f}" for x in u[frac]]
+        fmt[~fin] = [f"{x:,.1f}" for x in u[~fin]]
+        out[show] = fmt[inv]
+        return pd.Series(out, index=s.index, name=s.name)
+    vals = s.to_numpy(dtype=object)
+    keep = ~pd.isna(vals)
+    out = np.full(len(vals), "", dtype=object)
+    kept = vals[keep]
+    codes, uniq = pd.factorize(pd.Series(kept, dtype=object).astype(str))
+    fmt = np.array([_format_number_text(t) for t in uniq], dtype=object)[codes]
+    passthru = np.array([f is None for f in fmt], dtype=bool)
+    fmt[passthru] = kept[passthru]
+    out[keep] = fmt
+    return pd.Series(out, index=s.index, name=s.name).infer_objects()
 
 def clean_key(val):
     if pd.isna(val) or str(val).strip().lower() == 'nan': return ""
@@ -517,11 +765,119 @@ def clean_key(val):
     if val_str.endswith('.0'): val_str = val_str[:-2]
     return val_str
 
-# 숫자/텍스트 혼동 및 콤마 완벽 해결 평가 함수
-def evaluate_condition(df, col, cond):
+def clean_key_series(s):
+    """clean_key 열 단위 처리 (셀마다 적용한 것과 같은 결과).
+    숫자/문자 열은 str 메서드로, 그 외(날짜 등) 열은 셀마다 clean_key"""
+    if not (s.dtype == object or s.dtype == np.int64 or s.dtype == np.float64 or pd.api.types.is_string_dtype(s)):
+        return s.map(clean_key)
+    txt = s.astype(str).str.strip()
+    na = s.isna() | (txt.str.lower() == 'nan')
+    txt = txt.str.replace(' ', '', regex=False).str.upper().str.replace(r'\.0$', '', regex=True)
+    return txt.where(~na, "")
+
+def coalesce_suffix_pairs(df, suffixes=('_파일1', '_파일2')):
+    """병합 후 suffix로 갈라진 같은 이름 열을 한 번에 통합 (파일1 값 우선, 비면 파일2)
+    통합 열은 기존처럼 나머지 열 뒤에 붙는다"""
+    s1, s2 = suffixes
+    pairs = [(c, c[:-len(s1)] + s2) for c in df.columns if c.endswith(s1) and c[:-len(s1)] + s2 in df.columns]
+    if not pairs:
+        return df
+    merged = {c1[:-len(s1)]: df[c1].combine_first(df[c2]) for c1, c2 in pairs}
+    drop = [c for pair in pairs for c in pair]
+    return pd.concat([df.drop(columns=drop), pd.DataFrame(merged, index=df.index)], axis=1)
+
+def _merge_block(df1, df2):
+    df_merged = pd.merge(df1, df2, left_on='merge_key1', right_on='merge_key2', how='outer', suffixes=('_파일1', '_파일2'))
+    return coalesce_suffix_pairs(df_merged)
+
+def merge_uploads(df1, df2, key1, key2, chunk_rows=0, progress=None):
+    """두 업로드 파일을 설계사 코드로 외부 병합 + 동일 열 통합 + 검색용 통합 키 생성
+    chunk_rows: 두 파일 합계 행 수가 이 값 이상이면 키 구간별로 나눠 조각마다 병합한 뒤
+    순서대로 이어 붙임 (병합 중간 메모리를 조각 크기로 제한) — 0이면 한 번에 병합"""
+    df1 = df1.assign(merge_key1=clean_key_series(df1[key1]))
+    df2 = df2.assign(merge_key2=clean_key_series(df2[key2]))
+    total = len(df1) + len(df2)
+    if not chunk_rows or total < chunk_rows:
+        df_merged = _merge_block(df1, df2)
+    else:
+        n_parts = -(-total // int(chunk_rows))
+        k1 = df1['merge_key1'].to_numpy(dtype=object)
+        k2 = df2['merge_key2'].to_numpy(dtype=object)
+        # 키 사전순 구간으로 분할 — outer 병합 결과가 키 사전순이므로 조각을 차례로 붙이면 한 번에 병합한 것과 같은 순서
+        all_keys = np.sort(np.concatenate([k1, k2]))
+        bounds = all_keys[np.arange(1, n_parts) * total // n_parts]
+        part1 = np.searchsorted(bounds, k1, side='right')
+        part2 = np.searchsorted(bounds, k2, side='right')
+        del all_keys
+        parts = []
+        for i in range(n_parts):
+            block = _merge_block(df1[part1 == i], df2[part2 == i])
+            if len(block):
+                parts.append(block)
+            if progress is not None:
+                progress.progress((i + 1) / n_parts, text=f"분할 병합 중... ({i + 1}/{n_parts})")
+        df_merged = pd.concat(parts, ignore_index=True) if parts else _merge_block(df1.iloc[:0], df2.iloc[:0])
+        del parts
+    
+    # ✅ 두 파일의 merge key를 통합한 검색용 키 생성
+    df_merged['_unified_search_key'] = df_merged['merge_key1'].combine_first(df_merged['merge_key2'])
+    return df_merged
+
+_COND_OPS = {'==': operator.eq, '!=': operator.ne, '>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt}
+
+def _normalize_condition(cond):
     cond_clean = re.sub(r'(?<=\d),(?=\d)', '', cond).strip()
     # ✅ 단일 = 를 == 로 자동 변환 (>=, <=, !=, == 는 건드리지 않음)
-    cond_clean = re.sub(r'(?<![><!= ])=(?!=)', '==', cond_clean)
+    return re.sub(r'(?<![><!= ])=(?!=)', '==', cond_clean)
+
+@st.cache_resource(show_spinner=False, max_entries=512)
+def _parse_condition(cond_clean):
+    """정규화된 조건식 → (연산자, 리터럴) 또는 None — 프로세스 전체에서 재실행·로그인 간 공유"""
+    m = re.fullmatch(r'(==|!=|>=|<=|>|<)\s*(.+)', cond_clean, flags=re.S)
+    if not m: return None
+    try:
+        node = ast.parse(m.group(2).strip(), mode='eval').body
+    except (SyntaxError, ValueError):
+        return None
+    sign = 1
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        sign = -1 if isinstance(node.op, ast.USub) else 1
+        node = node.operand
+        if not isinstance(node, ast.Constant) or isinstance(node.value, str): return None
+    if not isinstance(node, ast.Constant) or isinstance(node.value, bool) or not isinstance(node.value, (int, float, str)):
+        return None
+    lit = node.value if isinstance(node.value, str) else sign * node.value
+    return m.group(1), lit
+
+def compile_condition(cond):
+    """'>= 500,000', "== '정상'" 같은 단일 비교식을 (연산자, 리터럴)로 파싱 (그 외 형태는 None → eval 경로)"""
+    return _parse_condition(_normalize_condition(str(cond)))
+
+def _typed_condition_column(s):
+    """조건 평가용 열 변환 → (문자형 여부, 숫자 배열(빈값 0), 원본 object 배열)"""
+    temp_s = s.astype(str).str.replace(',', '', regex=False)
+    num_s = pd.to_numeric(temp_s, errors='coerce')
+    is_text = bool(num_s.isna().all() and not temp_s.replace('', np.nan).isna().all())
+    return is_text, num_s.fillna(0).to_numpy(dtype=float), s.to_numpy(dtype=object)
+
+# 숫자/텍스트 혼동 및 콤마 완벽 해결 평가 함수
+def evaluate_condition(df, col, cond, typed=None):
+    """typed: 같은 df에서 여러 조건을 평가할 때 열 변환 결과를 재사용할 dict (선택)"""
+    compiled = compile_condition(cond) if col in df.columns and isinstance(df[col], pd.Series) else None
+    if compiled:
+        op, lit = compiled
+        if typed is not None and col in typed:
+            is_text, num, raw = typed[col]
+        else:
+            is_text, num, raw = _typed_condition_column(df[col])
+            if typed is not None: typed[col] = (is_text, num, raw)
+        if not is_text and not isinstance(lit, str):
+            return pd.Series(_COND_OPS[op](num, lit), index=df.index)
+        if isinstance(lit, str) and op in ('==', '!='):
+            # 숫자 열 ↔ 문자열은 항상 불일치, 문자 열은 원본 값과 직접 비교
+            hit = (raw == lit) if is_text else np.zeros(len(df), dtype=bool)
+            return pd.Series(hit if op == '==' else ~hit, index=df.index)
+    cond_clean = _normalize_condition(cond)
     try:
         temp_s = df[col].astype(str).str.replace(',', '', regex=False)
         num_s = pd.to_numeric(temp_s, errors='coerce')
@@ -539,26 +895,291 @@ def evaluate_condition(df, col, cond):
         except Exception:
             return pd.Series(False, index=df.index)
 
-@st.cache_data(show_spinner=False)
-def load_file_data(file_bytes, file_name):
+def goal_next_tiers(vals, tiers, refs=None):
+    """목표 구간 일괄 계산 → (다음목표 라벨 배열, 부족금액 배열)
+    refs가 있으면 행마다 ref 이하 구간만 적용 (적용 구간이 없으면 '목표 없음')"""
+    vals = np.asarray(vals)
+    t = np.asarray(tiers, dtype=float)
+    m = len(t)
+    labels = np.array([f"{int(x)//10000}만" if x % 10000 == 0 else f"{x/10000:g}만" for x in tiers]
+                      + ["최고 구간 달성", "목표 없음"], dtype=object)
+    if m == 0 or np.all(np.diff(t) >= 0):
+        # 오름차순 구간: 다음 목표 = val보다 큰 첫 구간, 상한 = ref 이하 구간 수
+        idx = np.searchsorted(t, vals, side='right')
+        if refs is not None:
+            cap = np.searchsorted(t, refs, side='right')
+            idx = np.where(cap == 0, m + 1, np.where(idx < cap, idx, m))
+    else:
+        # 정렬되지 않은 구간(구 설정): 목록 순서대로 첫 번째 해당 구간
+        app = np.ones((m, len(vals)), dtype=bool) if refs is None else (t[:, None] <= np.asarray(refs)[None, :])
+        cand = app & (vals[None, :] < t[:, None])
+        idx = np.where(cand.any(axis=0), cand.argmax(axis=0), m)
+        if refs is not None:
+            idx = np.where(app.any(axis=0), idx, m + 1)
+    hit = idx < m
+    shortfall = np.where(hit, np.append(t, [0.0, 0.0])[idx] - vals, 0)
+    # 정수 목표/정수 실적이면 정수로 (행별 계산 때와 같은 dtype)
+    if not hit.any() or (np.issubdtype(vals.dtype, np.integer)
+                         and all(isinstance(tiers[i], (int, np.integer)) for i in np.unique(idx[hit]))):
+        shortfall = shortfall.astype(np.int64)
+    return labels[idx], shortfall
+
+def upload_digest(f_obj):
+    """업로드 파일 내용 해시 — 업로드(file_id)당 한 번만 계산해 세션에 보관"""
+    memo = st.session_state.setdefault('upload_digests', {})
+    if f_obj.file_id not in memo:
+        memo[f_obj.file_id] = hashlib.blake2b(f_obj.getbuffer(), digest_size=16).hexdigest()
+    return memo[f_obj.file_id]
+
+def _xlsx_cell(cell):
+    """openpyxl 셀 → 값 (pd.read_excel의 openpyxl 변환 규칙과 동일)"""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+    if cell.value is None: return ""
+    if cell.data_type == TYPE_ERROR: return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        return val if val == cell.value else float(cell.value)
+    return cell.value
+
+def read_xlsx_with_meta(file_bytes):
+    """xlsx 첫 시트를 openpyxl read_only로 한 번만 훑어 (DataFrame, 메타데이터) 반환
+    DataFrame은 pd.read_excel(header=0)과 같은 결과 (행 정리 후 pandas TextParser로 열 타입 추론)
+    메타데이터: modified/created (문서 속성), dimensions (시트 범위), header (첫 행)"""
+    import openpyxl
+    from pandas.io.parsers import TextParser
+    wb = openpyxl.load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        try: dims = ws.calculate_dimension()
+        except Exception: dims = None
+        ws.reset_dimensions()
+        data, last = [], -1
+        for n, row in enumerate(ws.rows):
+            vals = [_xlsx_cell(c) for c in row]
+            while vals and vals[-1] == "": vals.pop()
+            if vals: last = n
+            data.append(vals)
+        meta = {'modified': wb.properties.modified, 'created': wb.properties.created, 'dimensions': dims}
+    finally:
+        wb.close()
+    data = data[:last + 1]
+    meta['header'] = [str(v) for v in data[0]] if data else []
+    if not data:
+        return pd.DataFrame(), meta
+    width = max(len(r) for r in data)
+    data = [r + [""] * (width - len(r)) for r in data]
+    try:
+        df = TextParser(data, header=0, skip_blank_lines=False).read()
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame()
+    return df, meta
+
+def _write_ingest_cache(df, meta, path, keep=8):
+    """파싱 결과를 Arrow 파일로 보관 (메타데이터는 스키마 메타에) — 다시 읽었을 때 원본과 똑같은 경우에만 남김"""
+    try:
+        os.makedirs(INGEST_DIR, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               b'ingest_meta': json.dumps(meta, ensure_ascii=False, default=str).encode('utf-8')})
+        feather.write_feather(table, path + ".tmp", compression='uncompressed')
+        back = feather.read_table(path + ".tmp").to_pandas()
+        if list(back.columns) == list(df.columns) and back.dtypes.equals(df.dtypes) and back.equals(df):
+            os.replace(path + ".tmp", path)
+        else:
+            os.remove(path + ".tmp")
+        # 오래된 캐시 정리 (최근 keep개만 유지)
+        olds = sorted((os.path.join(INGEST_DIR, f) for f in os.listdir(INGEST_DIR) if f.endswith('.arrow')),
+                      key=os.path.getmtime)
+        for f in olds[:-keep]:
+            os.remove(f)
+    except Exception:
+        try: os.remove(path + ".tmp")
+        except Exception: pass
+
+def _ingest_meta(raw):
+    meta = json.loads(raw.decode('utf-8'))
+    for k in ('modified', 'created'):
+        if meta.get(k): meta[k] = datetime.fromisoformat(meta[k])
+    return meta
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_file_data(digest, _f_obj, file_name):
+    """업로드 파일 파싱 → (DataFrame, 메타데이터) — 내용 해시 digest로 캐시 (파일 바이트는 해시하지 않음)
+    디스크 캐시(INGEST_DIR)에 같은 내용이 있으면 파싱을 건너뜀 (재업로드·재시작 시). csv의 메타데이터는 {}"""
+    path = os.path.join(INGEST_DIR, f"{digest}.arrow")
+    if pa is not None and os.path.exists(path):
+        try:
+            table = feather.read_table(path)
+            return table.to_pandas(), _ingest_meta(table.schema.metadata.get(b'ingest_meta', b'{}'))
+        except Exception:
+            pass
+    file_bytes = _f_obj.getvalue()
     if file_name.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(file_bytes), encoding='utf-8', errors='replace')
+        df, meta = pd.read_csv(io.BytesIO(file_bytes), encoding='utf-8', errors='replace'), {}
     else:
-        df = pd.read_excel(io.BytesIO(file_bytes))
-    for col in df.columns:
-        if df[col].dtype == object:
-            df[col] = df[col].apply(decode_excel_text)
-    return df
+        df, meta = read_xlsx_with_meta(file_bytes)
+    df = decode_excel_frame(df)
+    if pa is not None:
+        _write_ingest_cache(df, meta, path)
+    return df, meta
 
 # ==========================================
 # ★ HTML 테이블 렌더링 함수
 # ==========================================
-def render_html_table(df, col_groups=None, prize_data_map=None):
+def split_clip_columns(columns):
+    """카톡 이름줄 열(지사명 + 설계사명)과 데이터 열 분류"""
+    clip_name_keywords = ['지사', '설계사명', '성명', '이름', '팀장명']
+    goal_keywords = ['다음목표', '부족금액']
+    
+    clip_name_cols = []
+    data_cols = []
+    for c in columns:
+        if c == '순번' or c == '맞춤분류':
+            continue
+        if any(kw in c for kw in goal_keywords):
+            data_cols.append(c)
+        elif any(kw in c for kw in clip_name_keywords) and '코드' not in c and '번호' not in c:
+            clip_name_cols.append(c)
+        else:
+            data_cols.append(c)
+    return clip_name_cols, data_cols
+
+def _clip_context():
+    """기준일 / 카톡 인사말"""
+    data_date = ''
+    clip_footer = ''
+    try:
+        data_date = st.session_state.get('data_date', '')
+        clip_footer = st.session_state.get('clip_footer', '')
+    except Exception:
+        pass
+    if not clip_footer.strip():
+        clip_footer = "팀장님! 시상 부족금액 안내드려요!\n부족한 거 챙겨서 꼭 시상 많이 받아 가셨으면 좋겠습니다!\n좋은 하루 되세요!"
+    return data_date, clip_footer
+
+def build_row_clip_text(row, clip_name_cols, data_cols, col_to_grp, prize, data_date, clip_footer):
+    """테이블 한 행의 카톡 복사 텍스트
+    prize: (results, total) 또는 None
+    """
+    goal_keywords = ['다음목표', '부족금액']
+    
+    # 인적사항 조합: 대리점명 + 이름 + "팀장님"
+    name_parts = []
+    for c in clip_name_cols:
+        v = str(row[c]) if not pd.isna(row[c]) else ''
+        if v.strip() and v != '0':
+            name_parts.append(v.strip())
+    person_line = ' '.join(name_parts)
+    if person_line and not person_line.endswith('님'):
+        person_line += ' 팀장님'
+    
+    lines = []
+    lines.append("📋 메리츠 시상 현황 안내")
+    if data_date:
+        lines.append(f"📅 기준일: {data_date}")
+    lines.append("")
+    lines.append(f"👤 {person_line}")
+    lines.append("")
+    
+    current_group = None
+    for c in data_cols:
+        # 코드 열은 카톡 복사에서 제외
+        if '코드' in c or '번호' in c:
+            continue
+        val = str(row[c]) if not pd.isna(row[c]) else ''
+        if not val.strip() or val == '0':
+            continue
+    
+        grp = col_to_grp.get(c)
+        is_goal = any(kw in c for kw in goal_keywords)
+    
+        if grp and grp != current_group:
+            if current_group is not None:
+                lines.append("")
+            lines.append(f"━━ {grp} ━━")
+            current_group = grp
+        elif grp is None and not is_goal and current_group is not None:
+            # 일반 데이터 열이 그룹 밖으로 나가면 구분선
+            lines.append("")
+            current_group = None
+        # is_goal이면 이전 그룹 유지 (구분선 삽입 안 함)
+    
+        if '부족금액' in c:
+            lines.append(f"🔴 {c}: {val}")
+        elif '다음목표' in c:
+            lines.append(f"🎯 {c}: {val}")
+        else:
+            lines.append(f"  {c}: {val}")
+    
+    # 시상금 정보 추가
+    if prize:
+        p_results, p_total = prize
+        prize_text = format_prize_clip_text(p_results, p_total)
+        if prize_text:
+            lines.append(prize_text)
+    
+    # 인사말 추가
+    if clip_footer:
+        lines.append("")
+        lines.append(clip_footer)
+    
+    return '\n'.join(lines)
+
+def build_row_prize_html(prize):
+    """테이블 한 행의 시상금 팝업 HTML (시상 없으면 '')"""
+    if not prize:
+        return ''
+    p_results, p_total = prize
+    p_gugan = [r for r in p_results if r['category'] == 'weekly' and r['type'] == '구간']
+    p_bridge = [r for r in p_results if r['category'] == 'weekly' and '브릿지' in r['type']]
+    p_cumul = [r for r in p_results if r['category'] == 'cumulative']
+    p_cumul_sum = sum(r['prize'] for r in p_cumul)
+    p_bridge_sum = sum(r['prize'] for r in p_bridge)
+    
+    ph = f'<div style="padding:5px;">'
+    ph += f'<div style="font-weight:800;color:#d9232e;font-size:18px;margin-bottom:4px;">💰 총 시상금: {p_total:,.0f}원</div>'
+    if p_cumul_sum > 0 or p_bridge_sum > 0:
+        parts = []
+        if p_cumul_sum > 0: parts.append(f"누계 {p_cumul_sum:,.0f}")
+        if p_bridge_sum > 0: parts.append(f"브릿지 {p_bridge_sum:,.0f}")
+        ph += f'<div style="color:#888;font-size:13px;margin-bottom:12px;">({" + ".join(parts)})</div>'
+    if p_gugan:
+        ph += '<div style="font-size:12px;color:#4e5968;font-weight:700;margin:8px 0 4px;border-bottom:1px solid #eee;padding-bottom:4px;">📌 시책 진행 현황 (누계에 포함)</div>'
+        for r in p_gugan:
+            pz = f"{r['prize']:,.0f}원" if r['prize'] > 0 else "0원"
+            ph += f'<div style="display:flex;justify-content:space-between;padding:6px 0;border-bottom:1px solid #f0f0f0;"><span style="color:#888;">{r["name"]}</span><span style="color:#888;font-weight:600;">{pz}</span></div>'
+            if r.get('shortfall', 0) > 0 and r.get('next_tier'):
+                ph += f'<div style="padding:2px 0 6px 10px;color:#ff6b00;font-size:13px;">→ 다음 {int(r["next_tier"]//10000)}만까지 {r["shortfall"]:,.0f}원</div>'
+    if p_bridge:
+        ph += '<div style="font-size:12px;color:#d4380d;font-weight:700;margin:8px 0 4px;border-bottom:1px solid #eee;padding-bottom:4px;">🌉 브릿지 시상</div>'
+        for r in p_bridge:
+            pz = f"{r['prize']:,.0f}원" if r['prize'] > 0 else "0원"
+            ph += f'<div style="display:flex;justify-content:space-between;padding:6px 0;border-bottom:1px solid #f0f0f0;"><span style="color:#555;">{r["name"]}</span><span style="color:#d9232e;font-weight:700;">{pz}</span></div>'
+            if r.get('shortfall', 0) > 0 and r.get('next_tier'):
+                ph += f'<div style="padding:2px 0 6px 10px;color:#ff6b00;font-size:13px;">→ 다음 {int(r["next_tier"]//10000)}만까지 {r["shortfall"]:,.0f}원</div>'
+            elif r.get('shortfall_curr', 0) > 0:
+                ph += f'<div style="padding:2px 0 6px 10px;color:#ff6b00;font-size:13px;">→ 당월 필수까지 {r["shortfall_curr"]:,.0f}원 부족</div>'
+    if p_cumul:
+        ph += '<div style="font-size:12px;color:#2B6CB0;font-weight:700;margin:8px 0 4px;border-bottom:1px solid #eee;padding-bottom:4px;">📈 누계 시상</div>'
+        for r in p_cumul:
+            pz = f"{r['prize']:,.0f}원" if r['prize'] > 0 else "0원"
+            ph += f'<div style="display:flex;justify-content:space-between;padding:6px 0;border-bottom:1px solid #f0f0f0;"><span style="color:#555;">{r["name"]}</span><span style="color:#d9232e;font-weight:700;">{pz}</span></div>'
+    ph += '</div>'
+    return ph
+
+def _text_width(s):
+    """대략적인 표시 폭 (한글 등 전각 2칸)"""
+    return sum(2 if ord(ch) > 127 else 1 for ch in s)
+
+def render_html_table(df, col_groups=None, prize_data_map=None, lazy=False, virtual=False):
     """DataFrame을 틀 고정 + 그룹 헤더 + 정렬 + 반응형 HTML 테이블로 변환
     ★ colspan 없이 셀 수를 항상 동일하게 유지 → 밀림 방지
     prize_data_map: {row_idx: (results, total)} — 시상금 데이터
+    lazy: True면 카톡 문구·시상 HTML을 싣지 않고 행 번호로 서버에 요청 (render_lazy_table)
+    virtual: True면 행/카드 HTML 대신 열 배열만 싣고 보이는 구간만 브라우저에서 그림
     """
-    table_id = f"perf_{uuid.uuid4().hex[:8]}"
+    # lazy 모드는 재실행마다 같은 HTML이어야 프레임이 다시 그려지지 않음
+    table_id = "perf_lazy" if lazy else f"perf_{uuid.uuid4().hex[:8]}"
     num_cols = len(df.columns)
     shortfall_cols = set(c for c in df.columns if '부족금액' in c)
     col_groups = col_groups or []
@@ -861,7 +1482,15 @@ def render_html_table(df, col_groups=None, prize_data_map=None):
     html += '</tr></thead><tbody>'
 
     # ── 본문 ──
-    for row_idx, (_, row) in enumerate(df.iterrows()):
+    if virtual:
+        # 열 폭 고정용 숨김 행 (열별 가장 긴 값) — 스크롤해도 열 폭이 흔들리지 않음
+        html += '<tr class="vz">'
+        for i, col in enumerate(columns):
+            vals = ["" if pd.isna(v) else str(v) for v in df[col].tolist()]
+            widest = max(vals + [str(len(df))], key=_text_width)
+            html += f'<td data-col="{i}">{widest}</td>'
+        html += '<td data-col="-1"><button class="d-copy-btn">📋</button><button class="d-copy-btn" style="margin-left:2px;">💰</button></td></tr>'
+    for row_idx, (_, row) in enumerate(df.iterrows() if not virtual else []):
         html += '<tr>'
         for i, col in enumerate(columns):
             val = row[col]
@@ -892,161 +1521,41 @@ def render_html_table(df, col_groups=None, prize_data_map=None):
             break
     
     # 식별 열 vs 데이터 열 분류
-    # 카톡 이름줄: 지사명 + 설계사명 딱 2개만
-    clip_name_keywords = ['지사', '설계사명', '성명', '이름', '팀장명']
+    clip_name_cols, data_cols = split_clip_columns(columns)
     goal_keywords = ['다음목표', '부족금액']
     
-    clip_name_cols = []
-    data_cols = []
-    for c in columns:
-        if c == '순번' or c == '맞춤분류':
-            continue
-        if any(kw in c for kw in goal_keywords):
-            data_cols.append(c)
-        elif any(kw in c for kw in clip_name_keywords) and '코드' not in c and '번호' not in c:
-            clip_name_cols.append(c)
-        else:
-            data_cols.append(c)
-    
     # 그룹별 열 매핑
     col_to_grp = {}
     for grp in col_groups:
         for c in grp['cols']:
             col_to_grp[c] = grp['name']
     
-    # 기준일 / 인사말
-    data_date = ''
-    clip_footer = ''
-    try:
-        data_date = st.session_state.get('data_date', '')
-        clip_footer = st.session_state.get('clip_footer', '')
-    except Exception:
-        pass
-    if not clip_footer.strip():
-        clip_footer = "팀장님! 시상 부족금액 안내드려요!\n부족한 거 챙겨서 꼭 시상 많이 받아 가셨으면 좋겠습니다!\n좋은 하루 되세요!"
-    
-    clip_texts = []
-    for row_idx, (_, row) in enumerate(df.iterrows()):
-        # 인적사항 조합: 대리점명 + 이름 + "팀장님"
-        name_parts = []
-        for c in clip_name_cols:
-            v = str(row[c]) if not pd.isna(row[c]) else ''
-            if v.strip() and v != '0':
-                name_parts.append(v.strip())
-        person_line = ' '.join(name_parts)
-        if person_line and not person_line.endswith('님'):
-            person_line += ' 팀장님'
-        
-        lines = []
-        lines.append("📋 메리츠 시상 현황 안내")
-        if data_date:
-            lines.append(f"📅 기준일: {data_date}")
-        lines.append("")
-        lines.append(f"👤 {person_line}")
-        lines.append("")
-        
-        current_group = None
-        for c in data_cols:
-            # 코드 열은 카톡 복사에서 제외
-            if '코드' in c or '번호' in c:
-                continue
-            val = str(row[c]) if not pd.isna(row[c]) else ''
-            if not val.strip() or val == '0':
-                continue
-            
-            grp = col_to_grp.get(c)
-            is_goal = any(kw in c for kw in goal_keywords)
-            
-            if grp and grp != current_group:
-                if current_group is not None:
-                    lines.append("")
-                lines.append(f"━━ {grp} ━━")
-                current_group = grp
-            elif grp is None and not is_goal and current_group is not None:
-                # 일반 데이터 열이 그룹 밖으로 나가면 구분선
-                lines.append("")
-                current_group = None
-            # is_goal이면 이전 그룹 유지 (구분선 삽입 안 함)
-            
-            if '부족금액' in c:
-                lines.append(f"🔴 {c}: {val}")
-            elif '다음목표' in c:
-                lines.append(f"🎯 {c}: {val}")
-            else:
-                lines.append(f"  {c}: {val}")
+    if lazy:
+        # 카톡 문구·시상 HTML은 버튼 클릭 시 서버에서 생성 (render_lazy_table)
+        clip_b64 = prize_b64 = "W10="  # "[]"
+    else:
+        data_date, clip_footer = _clip_context()
+        clip_texts = []
+        for row_idx, (_, row) in enumerate(df.iterrows()):
+            prize = prize_data_map.get(row_idx) if prize_data_map else None
+            clip_texts.append(build_row_clip_text(row, clip_name_cols, data_cols, col_to_grp, prize, data_date, clip_footer))
         
-        # 시상금 정보 추가
-        if prize_data_map and row_idx in prize_data_map:
-            p_results, p_total = prize_data_map[row_idx]
-            prize_text = format_prize_clip_text(p_results, p_total)
-            if prize_text:
-                lines.append(prize_text)
+        # JS 안전하게 전달 — HTML-safe base64 인코딩
+        import base64 as _b64
+        clip_json_bytes = json.dumps(clip_texts, ensure_ascii=False).encode('utf-8')
+        clip_b64 = _b64.b64encode(clip_json_bytes).decode('ascii')
         
-        # 인사말 추가
-        if clip_footer:
-            lines.append("")
-            lines.append(clip_footer)
-        
-        clip_texts.append('\n'.join(lines))
-    
-    # JS 안전하게 전달 — HTML-safe base64 인코딩
-    import base64 as _b64
-    clip_json_bytes = json.dumps(clip_texts, ensure_ascii=False).encode('utf-8')
-    clip_b64 = _b64.b64encode(clip_json_bytes).decode('ascii')
-    
-    # 💰 시상금 HTML 데이터 (행별)
-    prize_htmls = []
-    for row_idx in range(len(df)):
-        if prize_data_map and row_idx in prize_data_map:
-            p_results, p_total = prize_data_map[row_idx]
-            p_gugan = [r for r in p_results if r['category'] == 'weekly' and r['type'] == '구간']
-            p_bridge = [r for r in p_results if r['category'] == 'weekly' and '브릿지' in r['type']]
-            p_cumul = [r for r in p_results if r['category'] == 'cumulative']
-            p_cumul_sum = sum(r['prize'] for r in p_cumul)
-            p_bridge_sum = sum(r['prize'] for r in p_bridge)
-            
-            ph = f'<div style="padding:5px;">'
-            ph += f'<div style="font-weight:800;color:#d9232e;font-size:18px;margin-bottom:4px;">💰 총 시상금: {p_total:,.0f}원</div>'
-            if p_cumul_sum > 0 or p_bridge_sum > 0:
-                parts = []
-                if p_cumul_sum > 0: parts.append(f"누계 {p_cumul_sum:,.0f}")
-                if p_bridge_sum > 0: parts.append(f"브릿지 {p_bridge_sum:,.0f}")
-                ph += f'<div style="color:#888;font-size:13px;margin-bottom:12px;">({" + ".join(parts)})</div>'
-            if p_gugan:
-                ph += '<div style="font-size:12px;color:#4e5968;font-weight:700;margin:8px 0 4px;border-bottom:1px solid #eee;padding-bottom:4px;">📌 시책 진행 현황 (누계에 포함)</div>'
-                for r in p_gugan:
-                    pz = f"{r['prize']:,.0f}원" if r['prize'] > 0 else "0원"
-                    ph += f'<div style="display:flex;justify-content:space-between;padding:6px 0;border-bottom:1px solid #f0f0f0;"><span style="color:#888;">{r["name"]}</span><span style="color:#888;font-weight:600;">{pz}</span></div>'
-                    if r.get('shortfall', 0) > 0 and r.get('next_tier'):
-                        ph += f'<div style="padding:2px 0 6px 10px;color:#ff6b00;font-size:13px;">→ 다음 {int(r["next_tier"]//10000)}만까지 {r["shortfall"]:,.0f}원</div>'
-            if p_bridge:
-                ph += '<div style="font-size:12px;color:#d4380d;font-weight:700;margin:8px 0 4px;border-bottom:1px solid #eee;padding-bottom:4px;">🌉 브릿지 시상</div>'
-                for r in p_bridge:
-                    pz = f"{r['prize']:,.0f}원" if r['prize'] > 0 else "0원"
-                    ph += f'<div style="display:flex;justify-content:space-between;padding:6px 0;border-bottom:1px solid #f0f0f0;"><span style="color:#555;">{r["name"]}</span><span style="color:#d9232e;font-weight:700;">{pz}</span></div>'
-                    if r.get('shortfall', 0) > 0 and r.get('next_tier'):
-                        ph += f'<div style="padding:2px 0 6px 10px;color:#ff6b00;font-size:13px;">→ 다음 {int(r["next_tier"]//10000)}만까지 {r["shortfall"]:,.0f}원</div>'
-                    elif r.get('shortfall_curr', 0) > 0:
-                        ph += f'<div style="padding:2px 0 6px 10px;color:#ff6b00;font-size:13px;">→ 당월 필수까지 {r["shortfall_curr"]:,.0f}원 부족</div>'
-            if p_cumul:
-                ph += '<div style="font-size:12px;color:#2B6CB0;font-weight:700;margin:8px 0 4px;border-bottom:1px solid #eee;padding-bottom:4px;">📈 누계 시상</div>'
-                for r in p_cumul:
-                    pz = f"{r['prize']:,.0f}원" if r['prize'] > 0 else "0원"
-                    ph += f'<div style="display:flex;justify-content:space-between;padding:6px 0;border-bottom:1px solid #f0f0f0;"><span style="color:#555;">{r["name"]}</span><span style="color:#d9232e;font-weight:700;">{pz}</span></div>'
-            ph += '</div>'
-            prize_htmls.append(ph)
-        else:
-            prize_htmls.append('')
-    
-    prize_json_bytes = json.dumps(prize_htmls, ensure_ascii=False).encode('utf-8')
-    prize_b64 = _b64.b64encode(prize_json_bytes).decode('ascii')
+        # 💰 시상금 HTML 데이터 (행별)
+        prize_htmls = [build_row_prize_html(prize_data_map.get(i) if prize_data_map else None) for i in range(len(df))]
+        prize_json_bytes = json.dumps(prize_htmls, ensure_ascii=False).encode('utf-8')
+        prize_b64 = _b64.b64encode(prize_json_bytes).decode('ascii')
     
     # ══════════════════════════════════════════
     # 📱 모바일 카드 뷰 생성
     # ══════════════════════════════════════════
-    html += '<div class="mobile-view">'
+    html += f'<div class="mobile-view vm" id="mv_{table_id}">' if virtual else '<div class="mobile-view">'
     
-    for row_idx, (_, row) in enumerate(df.iterrows()):
+    for row_idx, (_, row) in enumerate(df.iterrows() if not virtual else []):
         # 인적사항 조합
         name_parts_card = []
         for c in clip_name_cols:
@@ -1134,6 +1643,32 @@ def render_html_table(df, col_groups=None, prize_data_map=None):
     
     html += '</div>'  # mobile-view
     
+    if virtual:
+        # 열 배열 + 카드 렌더용 메타 (행/카드 HTML은 브라우저에서 생성)
+        import base64 as _b64
+        prize_badge = {}
+        prize_card = {}
+        for row_idx, (p_results, p_total) in (prize_data_map or {}).items():
+            if p_total > 0:
+                prize_badge[str(row_idx)] = f"{int(p_total)//10000}만" if p_total >= 10000 and p_total % 10000 == 0 else f"{p_total:,.0f}"
+            prize_card[str(row_idx)] = build_prize_card_html(p_results, p_total)
+        vdata = {
+            'h': columns,
+            'c': [["" if pd.isna(v) else str(v) for v in df[col].tolist()] for col in columns],
+            'g': [col_to_grp.get(c) for c in columns],
+            'gc': group_color_map,
+            'sc': [c in shortfall_cols for c in columns],
+            'goal': [any(kw in c for kw in goal_keywords) for c in columns],
+            'cn': [columns.index(c) for c in clip_name_cols],
+            'dc': [columns.index(c) for c in data_cols],
+            'nm': columns.index(name_col) if name_col else -1,
+            'ni': columns.index('순번') if '순번' in columns else -1,
+            'pb': prize_badge,
+            'pc': prize_card,
+        }
+        vd_b64 = _b64.b64encode(json.dumps(vdata, ensure_ascii=False).encode('utf-8')).decode('ascii')
+        html += f'<div id="__vd" style="display:none">{vd_b64}</div>'
+    
     # ── 복사 팝업 오버레이 (iframe 내부) ──
     html += """
     <div id="clip-overlay" style="display:none; position:fixed; top:0; left:0; right:0; bottom:0;
@@ -1350,8 +1885,262 @@ def render_html_table(df, col_groups=None, prize_data_map=None):
     }}
     </script>
     """
+    
+    if lazy:
+        # 데이터 대신 table_frame 요청/응답으로 동작하도록 함수 교체
+        html += f"""
+    <script>
+    var clipBtn = null;
+    function copyClip(idx, btn, evt) {{ evt.stopPropagation(); clipBtn = btn; stReq('clip', idx); }}
+    function showPrize(idx, evt) {{ if (evt) evt.stopPropagation(); stReq('prize', idx); }}
+    function onRowPayload(p) {{
+        if (p.kind === 'clip') {{
+            var text = p.content, btn = clipBtn;
+            if (!text) return;
+            // 📱 모바일: 네이티브 공유, 실패 시 복사 (인라인 copyClip과 같은 순서)
+            if (isMobile() && navigator.share) {{
+                navigator.share({{ text: text }}).then(function() {{
+                    showCopied(btn);
+                }}).catch(function() {{
+                    fallbackCopy(text, btn);
+                }});
+                return;
+            }}
+            fallbackCopy(text, btn);
+        }} else if (p.kind === 'prize') {{
+            if (!p.content) {{ alert('시상금 데이터가 없습니다.'); return; }}
+            document.getElementById('prize-content').innerHTML = p.content;
+            document.getElementById('prize-overlay').style.display = 'flex';
+        }}
+    }}
+    function autoResize() {{
+        var vh = 900;
+        try {{ vh = window.parent.innerHeight || 900; }} catch(e) {{}}
+        var h = 0;
+        if (isMobile()) {{
+            var mv = document.querySelector('.mobile-view');
+            if (mv) h = Math.min(mv.scrollHeight + 20, Math.round(vh * 0.80));
+        }} else {{
+            var w = document.getElementById("wrap_{table_id}");
+            if (w) h = Math.min(w.scrollHeight + 4, Math.round(vh * 0.85));
+        }}
+        if (h) stHeight(h);
+    }}
+    </script>
+    """
+    
+    if virtual:
+        # 보이는 구간만 그리는 가상 스크롤 (정렬은 순서 배열, 틀 고정은 헤더 폭 기준)
+        html += f"""
+    <style>
+    .perf-table tbody tr.vz td {{ height: 0; line-height: 0; padding-top: 0; padding-bottom: 0; border-top: 0; border-bottom: 0; visibility: hidden; }}
+    .perf-table tbody tr.vs td {{ padding: 0; border: 0; background: transparent; }}
+    .perf-table tbody tr.vr td {{ background-color: #fff; }}
+    .perf-table tbody tr.vr.ve td {{ background-color: #f7f8fa; }}
+    .perf-table tbody tr.vr:hover td {{ background-color: #eef1f6; }}
+    .vm .m-card-head {{ flex-wrap: nowrap; overflow: hidden; height: 52px; }}
+    .vm .m-summary {{ overflow: hidden; }}
+    .vm .m-name {{ white-space: nowrap; }}
+    .vm .m-card-body {{ transition: none; }}
+    </style>
+    <script>
+    var VD = JSON.parse(decodeURIComponent(escape(atob(document.getElementById('__vd').textContent.trim()))));
+    var VN = VD.c.length ? VD.c[0].length : 0, NC = VD.h.length;
+    var VO = [], VS = false, VRH = 0, VP = 0, VOI = -1, VOH = 0, VX = 20;
+    for (var i = 0; i < VN; i++) VO.push(i);
+    
+    function vCls(c) {{ if (c >= FC_DESKTOP) return ""; return c === FC_DESKTOP - 1 ? "col-freeze col-freeze-last" : "col-freeze"; }}
+    function vSpacer(h, td) {{
+        if (h <= 0) return '';
+        return td ? '<tr class="vs"><td colspan="' + (NC + 1) + '" style="height:' + h + 'px"></td></tr>' : '<div style="height:' + h + 'px"></div>';
+    }}
+    function vRow(r, p) {{
+        var h = '<tr class="vr' + (p % 2 ? ' ve' : '') + '">';
+        for (var c = 0; c < NC; c++) {{
+            var v = (c === 0 && VS) ? String(p + 1) : VD.c[c][r];
+            h += '<td class="' + vCls(c) + (VD.sc[c] && v !== "" ? ' sc' : '') + '" data-col="' + c + '">' + v + '</td>';
+        }}
+        h += '<td data-col="-1"><button class="d-copy-btn" onclick="copyClip(' + r + ', this, event)">📋</button>';
+        if (VD.pc[r] !== undefined) h += '<button class="d-copy-btn" onclick="showPrize(' + r + ', event)" style="margin-left:2px;">💰</button>';
+        return h + '</td></tr>';
+    }}
+    function vrTable() {{
+        var w = document.getElementById("wrap_{table_id}"), t = document.getElementById("{table_id}");
+        if (!w || !t || isMobile()) return;
+        var tb = t.tBodies[0], rh = VRH || 32, hh = t.tHead.offsetHeight;
+        var s = Math.max(0, Math.floor((w.scrollTop - hh) / rh) - VX);
+        var e = Math.min(VN, s + Math.ceil(w.clientHeight / rh) + 2 * VX);
+        var h = tb.rows[0].outerHTML + vSpacer(s * rh, true);
+        for (var p = s; p < e; p++) h += vRow(VO[p], p);
+        tb.innerHTML = h + vSpacer((VN - e) * rh, true);
+        if (!VRH) {{
+            var fr = tb.querySelector('tr.vr');
+            if (fr && fr.offsetHeight) {{ VRH = fr.offsetHeight; vrTable(); return; }}
+        }}
+        applyFreeze();
+    }}
+    function vCard(r) {{
+        var open = r === VOI, cell = function(c) {{ return VD.c[c][r]; }};
+        var person = [];
+        VD.cn.forEach(function(c) {{ var v = cell(c); if (v.trim() && v !== '0') person.push(v.trim()); }});
+        var name = VD.nm >= 0 ? cell(VD.nm) : person.join(' ');
+        var num = VD.ni >= 0 ? cell(VD.ni) : String(r + 1);
+        var items = [];
+        VD.dc.forEach(function(c) {{
+            var n = VD.h[c], v = cell(c);
+            if (n.indexOf('부족금액') >= 0) {{ if (v && v !== '0' && v.trim()) items.push('<span class="m-sc">부족 ' + v + '</span>'); }}
+            else if (n.indexOf('다음목표') >= 0) {{ if (v && v.trim()) items.push('<span class="m-goal">' + v + '</span>'); }}
+        }});
+        if (VD.pb[r] !== undefined) items.push('<span style="background:#fff3e0;color:#d9232e;padding:2px 6px;border-radius:4px;font-size:11px;font-weight:700;">💰' + VD.pb[r] + '</span>');
+        var h = '<div class="m-card' + (open ? ' open' : '') + '"><div class="m-card-head" onclick="toggleCard(' + r + ')">';
+        h += '<span class="m-num">' + num + '</span><span class="m-name">' + name + '</span>';
+        if (items.length) h += '<span class="m-summary">' + items.join(' ') + '</span>';
+        h += '<span class="m-chevron">&#9660;</span></div><div class="m-card-body">';
+        if (open) {{
+            h += '<div class="m-copy-wrap"><button class="m-copy-btn" onclick="copyClip(' + r + ', this, event)">📋 카톡 보내기</button>';
+            if (VD.pc[r] !== undefined) h += '<button class="m-copy-btn" onclick="showPrize(' + r + ', event)" style="background:#fff3e0;color:#d9232e;border:1px solid #ffd4a8;margin-top:4px;">💰 시상금 상세 조회</button>';
+            h += '</div>';
+            VD.cn.forEach(function(c) {{
+                if (c === VD.nm) return;
+                var v = cell(c);
+                if (v.trim() && v !== '0') h += '<div class="m-row"><span class="m-label">' + VD.h[c] + '</span><span class="m-val">' + v + '</span></div>';
+            }});
+            var cur = null;
+            VD.dc.forEach(function(c) {{
+                var v = cell(c);
+                if (!v.trim() || v === '0') return;
+                var g = VD.g[c];
+                if (g && g !== cur) {{
+                    h += '<div class="m-grp-label" style="border-left:3px solid ' + (VD.gc[g] || '#4e5968') + '; padding-left:8px;">' + g + '</div>';
+                    cur = g;
+                }} else if (g === null && !VD.goal[c] && cur !== null) {{
+                    cur = null;
+                }}
+                h += '<div class="m-row' + (VD.sc[c] ? ' m-sc' : '') + '"><span class="m-label">' + VD.h[c] + '</span><span class="m-val">' + v + '</span></div>';
+            }});
+            if (VD.pc[r] !== undefined) h += VD.pc[r];
+        }}
+        return h + '</div></div>';
+    }}
+    // 카드 위치: 접힌 카드는 고정 높이(VP), 펼친 카드 1개만 실측 높이(VOH)
+    function vOffset(i) {{ return i * VP + (VOI >= 0 && i > VOI ? VOH - VP : 0); }}
+    function vIndexAt(y) {{
+        if (VOI < 0 || y < VOI * VP) return Math.floor(y / VP);
+        if (y < VOI * VP + VOH) return VOI;
+        return VOI + 1 + Math.floor((y - VOI * VP - VOH) / VP);
+    }}
+    function vrCards() {{
+        var mv = document.getElementById("mv_{table_id}");
+        if (!mv || !isMobile() || !VN) return;
+        if (!VP) {{
+            mv.innerHTML = vCard(VOI === 0 ? 1 : 0);
+            var first = mv.querySelector('.m-card');
+            VP = first ? first.offsetHeight + 10 : 64;
+        }}
+        if (VOI >= 0 && !VOH) VOH = VP;
+        var s = Math.max(0, vIndexAt(mv.scrollTop) - VX);
+        var e = Math.min(VN, vIndexAt(mv.scrollTop + mv.clientHeight) + 1 + VX);
+        var h = vSpacer(vOffset(s));
+        for (var i = s; i < e; i++) h += vCard(i);
+        mv.innerHTML = h + vSpacer(vOffset(VN) - vOffset(e));
+        if (VOI >= s && VOI < e) {{
+            var oc = mv.querySelector('.m-card.open');
+            if (oc && oc.offsetHeight + 10 !== VOH) {{ VOH = oc.offsetHeight + 10; vrCards(); }}
+        }}
+    }}
+    function toggleCard(r) {{
+        VOI = VOI === r ? -1 : r; VOH = 0;
+        vrCards();
+        setTimeout(autoResize, 50);
+    }}
+    function applyFreeze() {{
+        var t = document.getElementById("{table_id}");
+        FC = isMobile() ? Math.min(FC_DESKTOP, 2) : FC_DESKTOP;
+        if (!t || FC === 0) return;
+        var hr = t.querySelector("thead tr.rc");
+        if (!hr) return;
+        var lp = [], cl = 0;
+        for (var i = 0; i < FC; i++) {{ lp.push(cl); if (hr.cells[i]) cl += hr.cells[i].offsetWidth; }}
+        t.querySelectorAll(".col-freeze").forEach(function(c) {{
+            var idx = parseInt(c.getAttribute("data-col"));
+            if (!isNaN(idx) && idx < FC) {{
+                c.style.left = lp[idx] + "px";
+                c.style.position = "sticky";
+                c.style.zIndex = c.tagName === "TH" ? "3" : "1";
+            }} else if (!isNaN(idx) && idx >= FC) {{
+                c.style.position = "static";
+                c.style.boxShadow = "none";
+            }}
+        }});
+    }}
+    function sortTable(th) {{
+        var ci = parseInt(th.getAttribute("data-col"));
+        if (isNaN(ci)) return;
+        var asc = ss[ci] !== true; ss = {{}}; ss[ci] = asc;
+        var pos = {{}}, renum = VS;
+        VO.forEach(function(r, p) {{ pos[r] = p; }});
+        function key(r) {{ return ((ci === 0 && renum) ? String(pos[r] + 1) : VD.c[ci][r]).trim(); }}
+        VO.sort(function(a, b) {{
+            var aT = key(a), bT = key(b);
+            var aN = parseFloat(aT.replace(/,/g,"")), bN = parseFloat(bT.replace(/,/g,""));
+            if (aT === "" && bT === "") return 0;
+            if (aT === "") return 1; if (bT === "") return -1;
+            if (!isNaN(aN) && !isNaN(bN)) return asc ? aN - bN : bN - aN;
+            return asc ? aT.localeCompare(bT,'ko') : bT.localeCompare(aT,'ko');
+        }});
+        VS = true;  // 순번 재배정
+        document.getElementById("{table_id}").querySelectorAll("thead th").forEach(function(h) {{
+            var ar = h.querySelector(".sa"); if (!ar) return;
+            var hi = parseInt(h.getAttribute("data-col"));
+            if (hi === ci) {{ ar.textContent = asc ? "▲" : "▼"; ar.className = "sa active"; }}
+            else {{ ar.textContent = "▲▼"; ar.className = "sa"; }}
+        }});
+        vrTable();
+        setTimeout(autoResize, 50);
+    }}
+    function vThrottle(f) {{
+        var queued = false;
+        return function() {{
+            if (queued) return;
+            queued = true;
+            requestAnimationFrame(function() {{ queued = false; f(); }});
+        }};
+    }}
+    (function() {{
+        var w = document.getElementById("wrap_{table_id}"), mv = document.getElementById("mv_{table_id}");
+        if (w) w.addEventListener('scroll', vThrottle(vrTable));
+        if (mv) mv.addEventListener('scroll', vThrottle(vrCards));
+    }})();
+    window.addEventListener('load', function() {{ vrTable(); vrCards(); autoResize(); }});
+    window.addEventListener('resize', function() {{ VRH = 0; VP = 0; VOH = 0; vrTable(); vrCards(); }});
+    </script>
+    """
     return html
 
+_table_frame = components.declare_component("table_frame", path=TABLE_FRAME_DIR)
+
+def render_lazy_table(df, col_groups=None, prize_data_map=None, key="lazy_view", virtual=False):
+    """행 번호만 보내는 테이블 — 복사/시상 버튼을 누른 행의 내용만 서버에서 만들어 응답"""
+    html = render_html_table(df, col_groups=col_groups, prize_data_map=prize_data_map, lazy=True, virtual=virtual)
+    
+    payload = None
+    req = st.session_state.get(key)
+    if isinstance(req, dict) and req.get('n') != st.session_state.get(f"{key}_n"):
+        st.session_state[f"{key}_n"] = req.get('n')
+        row_idx = req.get('row')
+        if isinstance(row_idx, int) and 0 <= row_idx < len(df):
+            prize = prize_data_map.get(row_idx) if prize_data_map else None
+            if req.get('kind') == 'clip':
+                clip_name_cols, data_cols = split_clip_columns(list(df.columns))
+                col_to_grp = {c: grp['name'] for grp in (col_groups or []) for c in grp['cols']}
+                data_date, clip_footer = _clip_context()
+                content = build_row_clip_text(df.iloc[row_idx], clip_name_cols, data_cols, col_to_grp, prize, data_date, clip_footer)
+            else:
+                content = build_row_prize_html(prize)
+            payload = {'kind': req.get('kind'), 'row': row_idx, 'n': req.get('n'), 'content': content}
+    
+    _table_frame(html=html, payload=payload, key=key, default=None)
+
 # ==========================================
 # 3. 사이드바 (메뉴 선택)
 # ==========================================
@@ -1362,21 +2151,24 @@ menu = st.sidebar.radio("이동할 화면을 선택하세요", ["매니저 화
 if st.session_state.get('admin_authenticated', False) and menu == "관리자 화면 (설정)":
     st.sidebar.divider()
     with st.sidebar.expander("💾 설정 백업 / 복원"):
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'rb') as f:
+        if os.path.exists(CONFIG_JSON):
+            with open(CONFIG_JSON, 'rb') as f:
                 cfg_bytes = f.read()
             st.download_button("⬇️ 현재 설정 다운로드", cfg_bytes,
-                             file_name="meritz_config_backup.pkl", mime="application/octet-stream")
+                             file_name="meritz_config_backup.json", mime="application/json")
         else:
             st.caption("저장된 설정이 없습니다.")
-        restore_file = st.file_uploader("⬆️ 백업 파일로 복원", type=['pkl'], key="restore_pkl")
+        restore_file = st.file_uploader("⬆️ 백업 파일로 복원 (.json / 이전 .pkl)", type=['json', 'pkl'], key="restore_pkl")
         if restore_file is not None:
             if st.button("복원 실행", key="btn_restore"):
                 try:
-                    test = pickle.loads(restore_file.getvalue())
+                    if restore_file.name.endswith('.pkl'):
+                        test = pickle.loads(restore_file.getvalue())
+                    else:
+                        test = json.loads(restore_file.getvalue().decode('utf-8'))
                     if isinstance(test, dict):
-                        with open(CONFIG_FILE, 'wb') as f:
-                            f.write(restore_file.getvalue())
+                        test.pop('df_merged', None)
+                        _write_config(test)
                         _reset_session_state()
                         load_data_and_config()
                         st.success("✅ 복원 완료!")
@@ -1389,13 +2181,14 @@ if st.session_state.get('admin_authenticated', False) and menu == "관리자 화
         st.caption("모든 설정과 데이터가 삭제됩니다.")
         confirm = st.text_input("'reset' 입력 후 실행", key="reset_confirm")
         if st.button("🔄 초기화 실행", disabled=(confirm != "reset")):
-            for fp in [CONFIG_FILE, DATA_FILE]:
+            for fp in [CONFIG_JSON, CONFIG_FILE, DATA_FILE, os.path.join(STORE_DIR, "CURRENT")]:
                 try:
                     if os.path.exists(fp):
                         shutil.copy2(fp, fp + ".before_reset")
                         os.remove(fp)
                 except Exception:
                     pass
+            clear_dataset()
             _reset_session_state()
             st.rerun()
 
@@ -1421,7 +2214,7 @@ if menu == "관리자 화면 (설정)":
     
     st.header("1. 데이터 파일 업로드 및 관리")
     if has_data():
-        st.success(f"✅ 현재 **{len(st.session_state['df_merged'])}행**의 데이터가 운영 중입니다. 새 파일을 업로드하면 데이터만 교체됩니다 (설정 유지).")
+        st.success(f"✅ 현재 **{len(get_dataset())}행**의 데이터가 운영 중입니다. 새 파일을 업로드하면 데이터만 교체됩니다 (설정 유지).")
     
     col_file1, col_file2 = st.columns(2)
     with col_file1: file1 = st.file_uploader("첫 번째 파일 업로드", type=['csv', 'xlsx'])
@@ -1430,8 +2223,8 @@ if menu == "관리자 화면 (설정)":
     if file1 is not None and file2 is not None:
         try:
             with st.spinner("파일을 읽고 있습니다..."):
-                df1 = load_file_data(file1.getvalue(), file1.name)
-                df2 = load_file_data(file2.getvalue(), file2.name)
+                df1, meta1 = load_file_data(upload_digest(file1), file1, file1.name)
+                df2, meta2 = load_file_data(upload_digest(file2), file2, file2.name)
             cols1 = df1.columns.tolist()
             cols2 = df2.columns.tolist()
             
@@ -1445,47 +2238,30 @@ if menu == "관리자 화면 (설정)":
                 col_key1, col_key2 = st.columns(2)
                 with col_key1: key1 = st.selectbox("첫 번째 파일의 [설계사 코드] 열 선택", cols1, index=idx1)
                 with col_key2: key2 = st.selectbox("두 번째 파일의 [설계사 코드] 열 선택", cols2, index=idx2)
+                new_chunk = st.number_input("🧩 두 파일 합계가 이 행 수 이상이면 나눠서 병합 (0: 한 번에 병합)",
+                                            min_value=0, step=50000, value=int(st.session_state.get('merge_chunk_rows', 200000)))
                 
                 submit_merge = st.form_submit_button("🔄 데이터 병합 및 교체 (설정 유지)")
                 if submit_merge:
                     with st.spinner("데이터를 병합하고 저장 중입니다..."):
-                        # ✅ 파일 생성일자 추출 (최신 날짜 저장)
-                        file_dates = []
-                        for f_obj in [file1, file2]:
-                            if f_obj.name.endswith('.xlsx'):
-                                try:
-                                    import openpyxl
-                                    wb = openpyxl.load_workbook(io.BytesIO(f_obj.getvalue()), read_only=True)
-                                    d = wb.properties.modified or wb.properties.created
-                                    if d: file_dates.append(d)
-                                    wb.close()
-                                except Exception:
-                                    pass
+                        # ✅ 파일 생성일자 추출 (최신 날짜 저장 — 읽을 때 함께 얻은 문서 속성 사용)
+                        file_dates = [d for d in (m.get('modified') or m.get('created') for m in [meta1, meta2]) if d]
                         if file_dates:
                             st.session_state['data_date'] = max(file_dates).strftime("%Y.%m.%d")
                         else:
                             st.session_state['data_date'] = datetime.now().strftime("%Y.%m.%d")
                         
-                        df1['merge_key1'] = df1[key1].apply(clean_key)
-                        df2['merge_key2'] = df2[key2].apply(clean_key)
-                        df_merged = pd.merge(df1, df2, left_on='merge_key1', right_on='merge_key2', how='outer', suffixes=('_파일1', '_파일2'))
-                        
-                        # ✅ suffix로 분리된 동일 열을 자동 통합 (coalesce)
-                        cols_1 = [c for c in df_merged.columns if c.endswith('_파일1')]
-                        for c1 in cols_1:
-                            base = c1.replace('_파일1', '')
-                            c2 = base + '_파일2'
-                            if c2 in df_merged.columns:
-                                df_merged[base] = df_merged[c1].combine_first(df_merged[c2])
-                                df_merged.drop(columns=[c1, c2], inplace=True)
-                        
-                        # ✅ 두 파일의 merge key를 통합한 검색용 키 생성
-                        df_merged['_unified_search_key'] = df_merged['merge_key1'].combine_first(df_merged['merge_key2'])
+                        # ✅ 키 정규화 → 외부 병합 → suffix 동일 열 통합 (대용량이면 분할 병합)
+                        st.session_state['merge_chunk_rows'] = int(new_chunk)
+                        chunked = bool(new_chunk) and len(df1) + len(df2) >= new_chunk
+                        bar = st.progress(0.0, text="분할 병합 중...") if chunked else None
+                        df_merged = merge_uploads(df1, df2, key1, key2, chunk_rows=int(new_chunk), progress=bar)
+                        if bar is not None: bar.empty()
                         
                         # merge key 선택값 저장 (다음 업로드 시 자동 선택)
                         st.session_state['merge_key1_col'] = key1
                         st.session_state['merge_key2_col'] = key2
-                        st.session_state['df_merged'] = df_merged
+                        publish_dataset(df_merged)
                         
                         # ✅ 기존 설정 검증 - 사라진 열이 있는 항목만 제거, 나머지 유지
                         new_cols = [c for c in df_merged.columns if c not in ['merge_key1', 'merge_key2']]
@@ -1548,7 +2324,7 @@ if menu == "관리자 화면 (설정)":
             warnings.append("⚠️ **매니저 이름 열**이 설정되지 않았습니다. 아래 3번에서 다시 선택해주세요.")
         for w in warnings:
             st.warning(w)
-        df = st.session_state['df_merged']
+        df = get_dataset()
         available_columns = [c for c in df.columns if c not in ['merge_key1', 'merge_key2', '_unified_search_key']]
         
         # ========================================
@@ -1560,10 +2336,16 @@ if menu == "관리자 화면 (설정)":
             default_footer = "팀장님! 시상 부족금액 안내드려요!\n부족한 거 챙겨서 꼭 시상 많이 받아 가셨으면 좋겠습니다!\n좋은 하루 되세요!"
             current_footer = st.session_state.get('clip_footer', '') or default_footer
             new_footer = st.text_area("카톡 하단 인사말 (줄바꿈 가능)", value=current_footer, height=100)
+            new_lazy = st.checkbox("⚡ 카톡 문구·시상 상세를 버튼 클릭 시 생성 (산하 인원이 많을 때 로딩 단축)",
+                                   value=st.session_state.get('lazy_table', False))
+            new_virtual = st.number_input("📜 이 인원 이상이면 보이는 행만 그리는 가상 스크롤 표 사용 (0: 사용 안 함)",
+                                          min_value=0, step=50, value=int(st.session_state.get('virtual_table_rows', 300)))
             
             if st.form_submit_button("저장"):
                 st.session_state['data_date'] = new_date
                 st.session_state['clip_footer'] = new_footer
+                st.session_state['lazy_table'] = new_lazy
+                st.session_state['virtual_table_rows'] = int(new_virtual)
                 save_data_and_config()
                 st.rerun()
         
@@ -1958,13 +2740,12 @@ if menu == "관리자 화면 (설정)":
 elif menu == "매니저 화면 (로그인)":
     st.session_state['admin_authenticated'] = False
     
-    df_check = st.session_state.get('df_merged', pd.DataFrame())
-    if not isinstance(df_check, pd.DataFrame) or df_check.empty or not st.session_state.get('manager_col'):
+    if not has_data() or not st.session_state.get('manager_col'):
         st.title("👤 매니저 전용 실적 현황")
         st.warning("현재 저장된 데이터가 없거나 관리자 설정이 완료되지 않았습니다.")
         st.stop()
         
-    df = st.session_state['df_merged'].copy()
+    df = get_dataset()  # 공용 프레임 — 본인 행만 골라낸 뒤 복사
     manager_col = st.session_state['manager_col']
     manager_name_col = st.session_state.get('manager_name_col', manager_col)
     
@@ -1972,26 +2753,41 @@ elif menu == "매니저 화면 (로그인)":
         manager_code = st.text_input("🔑 매니저 코드를 입력하세요", type="password")
         submit_login = st.form_submit_button("로그인 및 조회")
     
-    if submit_login and manager_code:
+    # 지연 생성 모드에서만 로그인 코드 유지 (테이블 컴포넌트 요청으로 재실행돼도 화면 유지)
+    lazy = st.session_state.get('lazy_table', False)
+    if submit_login and manager_code and lazy:
+        st.session_state['mgr_login_code'] = manager_code
+    elif submit_login or not lazy:
+        st.session_state.pop('mgr_login_code', None)
+    if not submit_login:
+        manager_code = st.session_state.get('mgr_login_code', '')
+    
+    if manager_code and 'mgr_login_code' in st.session_state:
+        if st.button("🔒 로그아웃", key="mgr_logout"):
+            st.session_state.pop('mgr_login_code', None)
+            st.rerun()
+    
+    if manager_code:
         manager_code_clean = clean_key(manager_code)
         
         # ✅ 주 매니저 코드 열 검색
-        df['search_key'] = df[manager_col].apply(clean_key)
-        mask = df['search_key'] == manager_code_clean
+        search_key = df[manager_col].apply(clean_key)
+        mask = search_key == manager_code_clean
         
         # ✅ 보조 매니저 코드 열 검색 (두 파일의 열 이름이 다를 때)
         manager_col2 = st.session_state.get('manager_col2', '')
+        search_key2 = None
         if manager_col2 and manager_col2 in df.columns:
-            df['search_key2'] = df[manager_col2].apply(clean_key)
-            mask = mask | (df['search_key2'] == manager_code_clean)
+            search_key2 = df[manager_col2].apply(clean_key)
+            mask = mask | (search_key2 == manager_code_clean)
         
         my_df = df[mask].copy()
         
         if my_df.empty:
             # 부분 일치 검색 (fallback)
-            partial_mask = df['search_key'].str.contains(manager_code_clean, na=False)
-            if manager_col2 and 'search_key2' in df.columns:
-                partial_mask = partial_mask | df['search_key2'].str.contains(manager_code_clean, na=False)
+            partial_mask = search_key.str.contains(manager_code_clean, na=False)
+            if search_key2 is not None:
+                partial_mask = partial_mask | search_key2.str.contains(manager_code_clean, na=False)
             my_df = df[partial_mask].copy()
 
         if my_df.empty:
@@ -2023,6 +2819,7 @@ elif menu == "매니저 화면 (로그인)":
             if st.session_state['admin_categories']:
                 if '맞춤분류' not in my_df.columns:
                     my_df['맞춤분류'] = ""
+                typed_cols = {}  # 조건 열 변환 결과 재사용 (카테고리 간 공유)
                 for cat in st.session_state['admin_categories']:
                     c_name = cat.get('name', '')
                     final_mask = pd.Series(True, index=my_df.index)
@@ -2030,10 +2827,11 @@ elif menu == "매니저 화면 (로그인)":
                     
                     for cond_info in cond_list:
                         if not cond_info.get('col'): continue
-                        mask = evaluate_condition(my_df, cond_info['col'], cond_info['cond'])
+                        mask = evaluate_condition(my_df, cond_info['col'], cond_info['cond'], typed=typed_cols)
                         final_mask = final_mask & mask
                         
                     my_df.loc[final_mask, '맞춤분류'] += f"[{c_name}] "
+                    typed_cols.pop('맞춤분류', None)
                 display_cols.append('맞춤분류')
             
             # -------------------------------------------------------------------
@@ -2082,31 +2880,14 @@ elif menu == "매니저 화면 (로그인)":
                     ref_cleaned = my_df[ref_col].astype(str).str.replace(',', '', regex=False)
                     my_df[ref_col] = pd.to_numeric(ref_cleaned, errors='coerce').fillna(0)
                 
-                def calc_shortfall(row):
-                    val = row[g_col]
-                    
-                    # 기준열(A)이 있으면, A값이 B 목표의 상한선
-                    if ref_col and ref_col in row.index:
-                        ref_val = row[ref_col]
-                        applicable_tiers = [t for t in tiers if t <= ref_val]
-                        if not applicable_tiers:
-                            # A값이 최소 구간보다 작으면 목표 없음
-                            return pd.Series(["목표 없음", 0])
-                    else:
-                        applicable_tiers = tiers
-                    
-                    # 적용 가능한 구간 중 다음 목표 찾기
-                    for t in applicable_tiers:
-                        if val < t:
-                            if t % 10000 == 0: tier_str = f"{int(t)//10000}만"
-                            else: tier_str = f"{t/10000:g}만"
-                            return pd.Series([tier_str, t - val])
-                    return pd.Series(["최고 구간 달성", 0])
-                
                 next_target_col = f"{g_col} 다음목표"
                 shortfall_col = f"{g_col} 부족금액"
                 
-                my_df[[next_target_col, shortfall_col]] = my_df.apply(calc_shortfall, axis=1)
+                # 기준열(A)이 있으면, A값이 B 목표의 상한선
+                refs = my_df[ref_col].to_numpy() if ref_col and ref_col in my_df.columns else None
+                labels, shortfall = goal_next_tiers(my_df[g_col].to_numpy(), tiers, refs)
+                my_df[next_target_col] = pd.Series(labels.tolist(), index=my_df.index)
+                my_df[shortfall_col] = shortfall
                 if next_target_col not in display_cols:
                     display_cols.extend([next_target_col, shortfall_col])
 
@@ -2141,19 +2922,7 @@ elif menu == "매니저 화면 (로그인)":
                 # 5. 세 자리 콤마(,) 포맷팅 및 [0값 빈칸 숨김 처리]
                 for c in final_df.columns:
                     if c != '순번' and '코드' not in c and '연도' not in c:
-                        def format_with_comma_and_hide_zero(val):
-                            try:
-                                if pd.isna(val) or str(val).strip() == "": return ""
-                                clean_val = str(val).replace(',', '')
-                                num = float(clean_val)
-                                if num == 0: return ""
-                                if num.is_integer(): return f"{int(num):,}"
-                                return f"{num:,.1f}"
-                            except:
-                                if str(val).strip() == "0" or str(val).strip() == "0.0": return ""
-                                return val
-                        
-                        final_df[c] = final_df[c].apply(format_with_comma_and_hide_zero)
+                        final_df[c] = format_with_comma_and_hide_zero(final_df[c])
                 
                 # 6. ★ HTML 테이블로 렌더링 (틀 고정 + 그룹 헤더 + 정렬 + 반응형)
                 col_groups = st.session_state.get('col_groups', [])
@@ -2163,8 +2932,8 @@ elif menu == "매니저 화면 (로그인)":
                 try:
                     prize_config = st.session_state.get('prize_config', [])
                     if prize_config:
-                        df_full = st.session_state.get('df_merged', pd.DataFrame())
-                        if not df_full.empty:
+                        prize_table = compile_prize_table(get_dataset(), json.dumps(prize_config, ensure_ascii=False, sort_keys=True, default=str), dataset_version())
+                        if prize_table:
                             # 사번 열 찾기
                             code_col = None
                             if '_unified_search_key' in my_df.columns:
@@ -2185,16 +2954,21 @@ elif menu == "매니저 화면 (로그인)":
                                         raw_code = my_df.loc[orig_idx, code_col] if code_col in my_df.columns else ''
                                         agent_code = clean_key(str(raw_code)) if not pd.isna(raw_code) else ''
                                         if agent_code:
-                                            results, total = calculate_prize_for_code(agent_code, prize_config, df_full)
+                                            results, total = prize_for_code(prize_table, agent_code)
                                             if results:
                                                 prize_data_map[row_idx] = (results, total)
                 except Exception:
                     pass
                 
-                table_html = render_html_table(final_df, col_groups=col_groups, prize_data_map=prize_data_map)
-                
-                # 테이블 내부 스크롤 사용 — iframe 높이는 뷰포트 85%로 제한
-                components.html(table_html, height=800, scrolling=False)
+                v_rows = st.session_state.get('virtual_table_rows', 300)
+                virtual = bool(v_rows) and len(final_df) >= v_rows
+                if lazy:
+                    render_lazy_table(final_df, col_groups=col_groups, prize_data_map=prize_data_map, virtual=virtual)
+                else:
+                    table_html = render_html_table(final_df, col_groups=col_groups, prize_data_map=prize_data_map, virtual=virtual)
+                    
+                    # 테이블 내부 스크롤 사용 — iframe 높이는 뷰포트 85%로 제한
+                    components.html(table_html, height=800, scrolling=False)
           except Exception as e:
             st.error(f"데이터 처리 중 오류가 발생했습니다: {e}")
             st.info("관리자 화면에서 설정을 확인해주세요.")
\ No newline at end of file